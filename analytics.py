@@ -0,0 +1,209 @@
+import json
+import logging
+import os
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the price histogram buckets (the last bucket is open-ended)
+PRICE_BUCKETS = (250, 500, 750, 1000, 1500, 2000, 3000, 5000)
+# Discount distribution in 10% steps: 0-9%, 10-19%, ... 70%+
+DISCOUNT_BUCKETS = (10, 20, 30, 40, 50, 60, 70)
+
+def stats_path(output_path):
+    """Analytics sidecar kept next to a run's data file"""
+    return output_path + '.stats.json'
+
+def _bucket(value, bounds):
+    for index, bound in enumerate(bounds):
+        if value < bound:
+            return index
+    return len(bounds)
+
+def _bucket_labels(bounds, fmt):
+    labels = [fmt(0, bounds[0])]
+    labels += [fmt(low, high) for low, high in zip(bounds, bounds[1:])]
+    labels.append(fmt(bounds[-1], None))
+    return labels
+
+class RunAnalytics:
+    """Summary statistics for one scrape run, updated page by page as records come in.
+
+    Everything kept here is O(brands + buckets), so rendering results never touches the data file.
+    """
+
+    def __init__(self):
+        self.total_products = 0
+        self.pages = 0
+        self.last_page = 0
+        self.price_count = 0
+        self.price_sum = 0
+        self.price_min = None
+        self.price_max = None
+        self.discounted = 0
+        self.discount_sum = 0
+        self.price_histogram = [0] * (len(PRICE_BUCKETS) + 1)
+        self.discount_histogram = [0] * (len(DISCOUNT_BUCKETS) + 1)
+        # brand -> [products, price count, price sum, min price, max price, discounted, discount sum]
+        self.brands = {}
+
+    def update(self, records, page_no=None):
+        for record in records:
+            self.total_products += 1
+            brand = self.brands.get(record.brand_name)
+            if brand is None:
+                brand = self.brands[record.brand_name] = [0, 0, 0, None, None, 0, 0]
+            brand[0] += 1
+
+            price = record.price
+            if price is not None:
+                self.price_count += 1
+                self.price_sum += price
+                self.price_min = price if self.price_min is None else min(self.price_min, price)
+                self.price_max = price if self.price_max is None else max(self.price_max, price)
+                self.price_histogram[_bucket(price, PRICE_BUCKETS)] += 1
+                brand[1] += 1
+                brand[2] += price
+                brand[3] = price if brand[3] is None else min(brand[3], price)
+                brand[4] = price if brand[4] is None else max(brand[4], price)
+
+            discount = record.discount_percent
+            if discount is not None:
+                self.discounted += 1
+                self.discount_sum += discount
+                self.discount_histogram[_bucket(discount, DISCOUNT_BUCKETS)] += 1
+                brand[5] += 1
+                brand[6] += discount
+        self.pages += 1
+        if page_no is not None:
+            self.last_page = page_no
+
+    @property
+    def price_avg(self):
+        return round(self.price_sum / self.price_count, 2) if self.price_count else 0
+
+    def top_brands(self, limit=10):
+        ranked = sorted(self.brands.items(), key=lambda item: (-item[1][0], item[0]))
+        return {brand: stats[0] for brand, stats in ranked[:limit]}
+
+    def brand_counts(self):
+        """Every brand with its product count, most products first - the results page's brand facet.
+
+        Products without a brand are left out, as the results index stores them without one.
+        """
+        ranked = sorted(self.brands.items(), key=lambda item: (-item[1][0], item[0]))
+        return [{'brand': brand, 'products': stats[0]} for brand, stats in ranked if brand not in ("N/A", None)]
+
+    def brand_stats(self, limit=10):
+        rows = []
+        for brand in self.top_brands(limit):
+            count, price_count, price_sum, price_min, price_max, discounted, discount_sum = self.brands[brand]
+            rows.append({
+                'brand': brand,
+                'products': count,
+                'avg_price': round(price_sum / price_count, 2) if price_count else None,
+                'min_price': price_min,
+                'max_price': price_max,
+                'avg_discount': round(discount_sum / discounted, 1) if discounted else None,
+            })
+        return rows
+
+    def to_dict(self):
+        """The analytics dict handed to the results template"""
+        price_labels = _bucket_labels(PRICE_BUCKETS, lambda low, high: f"₹{low}+" if high is None else f"₹{low}-{high - 1}")
+        discount_labels = _bucket_labels(DISCOUNT_BUCKETS, lambda low, high: f"{low}%+" if high is None else f"{low}-{high - 1}%")
+        return {
+            'total_products': self.total_products,
+            'top_brands': self.top_brands(),
+            'price_range': {
+                'min': self.price_min if self.price_min is not None else 0,
+                'max': self.price_max if self.price_max is not None else 0,
+                'avg': self.price_avg,
+            },
+            'price_histogram': [{'label': label, 'count': count}
+                                for label, count in zip(price_labels, self.price_histogram)],
+            'discount_distribution': [{'label': label, 'count': count}
+                                      for label, count in zip(discount_labels, self.discount_histogram)],
+            'discounted_products': self.discounted,
+            'avg_discount': round(self.discount_sum / self.discounted, 1) if self.discounted else 0,
+            'brand_stats': self.brand_stats(),
+        }
+
+    def save(self, path):
+        state = {name: getattr(self, name) for name in vars(self)}
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        analytics = cls()
+        for name, value in state.items():
+            if hasattr(analytics, name):
+                setattr(analytics, name, value)
+        return analytics
+
+    @classmethod
+    def from_frame(cls, df):
+        """Compute analytics for an existing data file (runs scraped before sidecars existed)"""
+        from product_records import ProductRecord
+
+        analytics = cls()
+        records = []
+        for row in df.itertuples(index=False):
+            row = row._asdict()
+            brand = row.get('brand_name')
+            records.append(ProductRecord.from_fields(
+                "N/A" if pd.isna(brand) else str(brand),
+                _as_price(row.get('price')),
+                _as_price(row.get('original_price')),
+                row.get('description'),
+                row.get('sizes'),
+                row.get('product_url'),
+            ))
+        analytics.update(records)
+        return analytics
+
+def _as_price(value):
+    # Older CSVs hold prices as text ('1299', 'N/A'); newer ones are numeric with blanks for missing
+    if value is None or pd.isna(value):
+        return None
+    if isinstance(value, str):
+        return value
+    return int(value)
+
+PRICE_COLUMNS = ('price', 'original_price', 'discount_percent')
+# Integer columns that plain readers turn into floats as soon as one value is missing
+INTEGER_COLUMNS = PRICE_COLUMNS + ('rating_count',)
+
+def read_data_file(output_path, nrows=None):
+    """Read a run's data file (CSV, NDJSON or Parquet dataset), optionally only its first rows"""
+    if output_path.endswith('.parquet'):
+        df = pd.read_parquet(output_path)
+        df = df.head(nrows) if nrows is not None else df
+    elif output_path.endswith('.ndjson'):
+        df = pd.read_json(output_path, lines=True, nrows=nrows)
+    else:
+        df = pd.read_csv(output_path, nrows=nrows)
+    # Keep prices integral even when some are missing (plain read_csv would turn them into floats)
+    for column in INTEGER_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors='coerce').round().astype('Int64')
+    return df
+
+def load_or_build(output_path):
+    """Load the analytics sidecar for output_path, building (and saving) it from the data file if missing"""
+    path = stats_path(output_path)
+    if os.path.exists(path):
+        try:
+            return RunAnalytics.load(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Rebuilding unreadable analytics sidecar {path}: {str(e)}")
+    logger.info(f"Building analytics sidecar for {output_path}")
+    analytics = RunAnalytics.from_frame(read_data_file(output_path))
+    analytics.save(path)
+    return analytics
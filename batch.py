@@ -0,0 +1,181 @@
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from http_backend import HttpFetcher
+from log_config import job_context
+from result_cache import normalize_search_term
+from run_catalog import term_slug
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 10.0  # Seconds before the first retry of a term, doubled for every further attempt
+MAX_BACKOFF = 300.0
+
+class BatchInterrupted(Exception):
+    """Raised inside a term's scrape to stop it after the page being written"""
+
+def read_terms(source):
+    """Search terms from a file, or stdin for '-': one per line, blank lines and # comments skipped.
+
+    Repeats (ignoring case and spacing) are dropped, keeping the first spelling.
+    """
+    if source == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    terms = {}
+    for line in lines:
+        term = line.strip()
+        if term and not term.startswith('#'):
+            terms.setdefault(normalize_search_term(term), term)
+    return list(terms.values())
+
+def default_checkpoint_path(terms):
+    """Checkpoint named after the term list, so rerunning the same batch finds it"""
+    digest = hashlib.sha1('\n'.join(normalize_search_term(term) for term in terms).encode('utf-8'))
+    return os.path.join('csv_data', f"batch_{digest.hexdigest()[:12]}.checkpoint.json")
+
+class BatchCheckpoint:
+    """Per-term state of a batch in a JSON file, rewritten atomically whenever a term changes state"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.terms = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.terms = json.load(f).get('terms', {})
+
+    def get(self, term):
+        with self._lock:
+            return dict(self.terms.get(normalize_search_term(term), {}))
+
+    def mark_pending(self, terms):
+        with self._lock:
+            for term in terms:
+                state = self.terms.setdefault(normalize_search_term(term), {'term': term, 'attempts': 0})
+                state['status'] = PENDING
+            self._save()
+
+    def update(self, term, **fields):
+        with self._lock:
+            state = self.terms.setdefault(normalize_search_term(term), {'term': term, 'attempts': 0})
+            state.update(fields, updated_at=time.time())
+            self._save()
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'terms': self.terms}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def summary(self):
+        with self._lock:
+            counts = {}
+            for state in self.terms.values():
+                counts[state.get('status', PENDING)] = counts.get(state.get('status', PENDING), 0) + 1
+            return counts
+
+def retry_delay(attempt, backoff=DEFAULT_BACKOFF):
+    """Seconds to wait before retrying after the given (1-based) failed attempt"""
+    return min(backoff * 2 ** (attempt - 1), MAX_BACKOFF)
+
+def run_batch(terms, scrape, checkpoint_path=None, workers=4, term_workers=None, retries=DEFAULT_RETRIES,
+              backoff=DEFAULT_BACKOFF, rate_limiter=None, backend=None, stop_event=None, **scrape_kwargs):
+    """Scrape every term with scrape (scrape_myntra), sharing one pool of page workers between them.
+
+    Up to term_workers terms are scraped at once and their pages are all scheduled on the same
+    workers, behind one global rate limiter. A term that fails is retried up to retries more
+    times with exponential backoff, continuing its interrupted output. Terms finished according
+    to the checkpoint are skipped, so rerunning an interrupted batch picks up where it stopped.
+    Returns the checkpoint's per-term states.
+    """
+    checkpoint = BatchCheckpoint(checkpoint_path or default_checkpoint_path(terms))
+    stop_event = stop_event or threading.Event()
+    term_workers = max(1, term_workers or workers)
+    todo = [term for term in terms if checkpoint.get(term).get('status') != DONE]
+    logger.info(f"Batch of {len(terms)} terms: {len(terms) - len(todo)} already done, {len(todo)} to scrape "
+                f"(checkpoint {checkpoint.path})")
+    checkpoint.mark_pending(todo)
+
+    def stop_check(page_no, rows):
+        if stop_event.is_set():
+            raise BatchInterrupted("batch stopped")
+
+    def scrape_term(term):
+        for attempt in range(1, retries + 2):
+            # Terms still queued when the batch is stopped never start
+            if stop_event.is_set():
+                raise BatchInterrupted("batch stopped")
+            state = checkpoint.get(term)
+            # Any earlier attempt, in this process or a previous one, left an output to continue
+            resume = state.get('attempts', 0) > 0
+            checkpoint.update(term, status=RUNNING, attempts=state.get('attempts', 0) + 1)
+            try:
+                with job_context(f"batch-{term_slug(term)}"):
+                    df = scrape(term, resume=resume, collect=False, raise_errors=True, executor=page_executor,
+                                rate_limiter=rate_limiter, http_fetcher=http_fetcher, backend=backend,
+                                workers=workers, on_page=stop_check, **scrape_kwargs)
+            except BatchInterrupted:
+                checkpoint.update(term, status=PENDING)
+                raise
+            except Exception as e:
+                if attempt > retries:
+                    logger.error(f"Giving up on '{term}' after {attempt} attempts: {str(e)}")
+                    checkpoint.update(term, status=FAILED, error=str(e))
+                    return FAILED
+                delay = retry_delay(attempt, backoff)
+                logger.warning(f"Scraping '{term}' failed (attempt {attempt}), retrying in {delay:.1f}s: {str(e)}")
+                checkpoint.update(term, status=PENDING, error=str(e))
+                if stop_event.wait(delay):
+                    raise BatchInterrupted("batch stopped")
+                continue
+            checkpoint.update(term, status=DONE, error=None, run_id=df.attrs.get('run_id'),
+                              output_path=df.attrs.get('output_path'), rows_written=df.attrs.get('rows_written'),
+                              stop_reason=df.attrs.get('stop_reason'))
+            logger.info(f"Finished '{term}': {df.attrs.get('rows_written')} products")
+            return DONE
+
+    # One fetcher for the whole batch keeps each page worker's keep-alive connections across terms
+    if (backend or os.environ.get('MYNTRA_BACKEND')) == 'http':
+        http_fetcher = HttpFetcher(pool_size=workers)
+    else:
+        http_fetcher = None
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='page-worker') as page_executor, \
+                ThreadPoolExecutor(max_workers=term_workers, thread_name_prefix='batch-term') as term_executor:
+            futures = [term_executor.submit(contextvars.copy_context().run, scrape_term, term) for term in todo]
+            try:
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except BatchInterrupted:
+                        pass
+            except BaseException:
+                # Ctrl-C: terms that have not started stay pending, running ones stop after their current page
+                stop_event.set()
+                for future in futures:
+                    future.cancel()
+                raise
+    finally:
+        if http_fetcher is not None:
+            http_fetcher.close()
+    logger.info(f"Batch finished: {checkpoint.summary()}")
+    return checkpoint.terms
@@ -0,0 +1,84 @@
+"""Compare CPU time and peak memory per page for the 'http' and 'selenium' fetch backends.
+
+Each backend runs in its own interpreter against the local fixture server so the resource
+usage (including Chrome and chromedriver child processes) is measured in isolation.
+
+Usage: python -m benchmarks.bench_backends [--pages 10] [--backends http,selenium]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_one(backend, pages, base_url):
+    """Scrape in this process and report usage for this process and its (reaped) children"""
+    sys.path.insert(0, REPO_ROOT)
+    import logging
+    import modified_myntra_scraper
+
+    logging.disable(logging.CRITICAL)
+    # Exclude interpreter start-up and import cost from the per-page figures
+    self_before = resource.getrusage(resource.RUSAGE_SELF)
+    start = time.perf_counter()
+    # The fixture server cycles through a few pages, so adaptive pagination would stop after them
+    df = modified_myntra_scraper.scrape_myntra('tshirts', no_of_pages=pages, workers=1, min_interval=0,
+                                               base_url=base_url, backend=backend, adaptive=False)
+    wall = time.perf_counter() - start
+
+    self_usage = resource.getrusage(resource.RUSAGE_SELF)
+    child_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = (self_usage.ru_utime + self_usage.ru_stime - self_before.ru_utime - self_before.ru_stime
+           + child_usage.ru_utime + child_usage.ru_stime)
+    # ru_maxrss is KiB on Linux; children report the largest single descendant
+    peak_rss_mb = max(self_usage.ru_maxrss, child_usage.ru_maxrss) / 1024
+    print(json.dumps({
+        'backend': backend,
+        'pages': pages,
+        'products': len(df),
+        'wall_seconds': round(wall, 3),
+        'cpu_seconds_per_page': round(cpu / pages, 4),
+        'peak_rss_mb': round(peak_rss_mb, 1),
+    }))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=10)
+    parser.add_argument('--backends', default='http,selenium')
+    parser.add_argument('--run-one', help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        run_one(args.run_one, args.pages, args.base_url)
+        return
+
+    from benchmarks.fixture_server import FixtureServer
+
+    results = []
+    with FixtureServer() as server, tempfile.TemporaryDirectory() as workdir:
+        for backend in args.backends.split(','):
+            env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+            proc = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_backends', '--run-one', backend,
+                 '--pages', str(args.pages), '--base-url', server.base_url],
+                cwd=workdir, env=env, capture_output=True, text=True
+            )
+            if proc.returncode != 0 or '"products": 0' in proc.stdout:
+                # scrape_myntra swallows errors, so an empty result means the backend could not run here
+                print(f"{backend}: failed (is Chrome installed?)\n{proc.stderr[-2000:]}", file=sys.stderr)
+                continue
+            results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    for result in results:
+        print(f"{result['backend']:>9}: {result['products']} products, {result['wall_seconds']}s wall, "
+              f"{result['cpu_seconds_per_page']}s CPU/page, {result['peak_rss_mb']} MB peak RSS")
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
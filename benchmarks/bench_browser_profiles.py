@@ -0,0 +1,84 @@
+"""Compare bytes transferred and time per page for the 'default' and 'lean' Chrome profiles.
+
+Serves heavy fixture pages (web fonts, a tracker, a promo video and a product image per card)
+from the local fixture server and scrapes them with one browser per profile.
+
+Usage: python -m benchmarks.bench_browser_profiles [--pages 6] [--profiles default,lean]
+"""
+import argparse
+import functools
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.fixture_server import FixtureServer, load_fixtures
+from benchmarks.make_fixtures import heavy_page
+
+def run_profile(profile, pages, server):
+    import modified_myntra_scraper
+    from browser_pool import BrowserPool, create_driver
+
+    pool = BrowserPool(size=1, driver_factory=functools.partial(create_driver, profile=profile))
+    try:
+        # Start the browser outside the timed region - the pool keeps it warm in real use
+        pool.warm_up()
+        bytes_before, requests_before, assets_before = server.bytes_sent, server.request_count, server.asset_requests
+        start = time.perf_counter()
+        df = modified_myntra_scraper.scrape_myntra('tshirts', no_of_pages=pages, workers=1, min_interval=0,
+                                                   base_url=server.base_url, browser_pool=pool,
+                                                   adaptive=False, product_store=False, raise_errors=True)
+        wall = time.perf_counter() - start
+    finally:
+        pool.close()
+    # Let requests the page fired after it was read (late images, video chunks) reach the counters
+    time.sleep(1.0)
+    return {
+        'profile': profile,
+        'pages': pages,
+        'products': len(df),
+        'seconds_per_page': round(wall / pages, 3),
+        'kib_per_page': round((server.bytes_sent - bytes_before) / pages / 1024, 1),
+        'requests_per_page': round((server.request_count - requests_before) / pages, 1),
+        'asset_requests': server.asset_requests - assets_before,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=6)
+    parser.add_argument('--profiles', default='default,lean')
+    parser.add_argument('--latency', type=float, default=0.02, help="Seconds added to every request")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    pages = [heavy_page(page) for page in load_fixtures('rendered')]
+    results = []
+    # scrape_myntra writes its output and catalog under the working directory
+    with FixtureServer(pages, latency=args.latency) as server, tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            for profile in args.profiles.split(','):
+                try:
+                    results.append(run_profile(profile, args.pages, server))
+                except Exception as e:
+                    print(f"{profile}: failed (is Chrome installed?) {e}", file=sys.stderr)
+        finally:
+            os.chdir(REPO_ROOT)
+
+    for result in results:
+        print(f"{result['profile']:>8}: {result['products']} products, {result['seconds_per_page']}s/page, "
+              f"{result['kib_per_page']} KiB/page over {result['requests_per_page']} requests/page")
+    by_profile = {result['profile']: result for result in results}
+    if 'default' in by_profile and 'lean' in by_profile:
+        base, lean = by_profile['default'], by_profile['lean']
+        print(f"lean saves {base['kib_per_page'] - lean['kib_per_page']:.1f} KiB and "
+              f"{base['seconds_per_page'] - lean['seconds_per_page']:.3f}s per page")
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Benchmark product-page enrichment against the local fixture server.
+
+Enriches the products of the saved listing pages one page at a time, fetching product pages
+serially and with increasing concurrency, then once more with a warm product store to show
+the TTL skip. Every run is checked against the values the fixture server put on the pages, and
+the exit status is 1 if any of them differ or the run within the TTL fetched anything.
+
+Usage: python -m benchmarks.bench_enrichment [--pages 3] [--latency 0.05] [--concurrency 1,4,8,16]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.fixture_server import FixtureServer, detail_values, load_fixtures
+
+def listing_records(pages):
+    from http_backend import extract_embedded_products
+
+    fixtures = load_fixtures()
+    return [extract_embedded_products(fixtures[i % len(fixtures)].decode('utf-8')) for i in range(pages)]
+
+def check(pages):
+    """Number of records whose enriched fields differ from what their product page shows"""
+    from product_store import parse_product_id
+
+    mismatches = 0
+    for records in pages:
+        for record in records:
+            expected = detail_values(parse_product_id(record.product_url))
+            if any(getattr(record, name) != value for name, value in expected.items()):
+                mismatches += 1
+    return mismatches
+
+def run(label, server, pages, concurrency, store=None):
+    from enrichment import ProductEnricher
+
+    records = listing_records(pages)
+    enricher = ProductEnricher(concurrency=concurrency, store=store, base_url=server.base_url)
+    requests_before = server.detail_requests
+    counts = {'fetched': 0, 'cached': 0, 'failed': 0}
+    start = time.perf_counter()
+    try:
+        for page in records:
+            for name, count in enricher.enrich(page).items():
+                counts[name] += count
+    finally:
+        enricher.close()
+    wall = time.perf_counter() - start
+    products = sum(len(page) for page in records)
+    return dict(counts, **{
+        'run': label,
+        'concurrency': concurrency,
+        'products': products,
+        'seconds': round(wall, 3),
+        'products_per_second': round(products / wall, 1) if wall else None,
+        'detail_requests': server.detail_requests - requests_before,
+        'mismatches': check(records),
+    })
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.05, help="Seconds added to every product page response")
+    parser.add_argument('--concurrency', default='1,4,8,16')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    from product_store import ProductStore
+
+    results = []
+    with FixtureServer(latency=args.latency) as server, tempfile.TemporaryDirectory() as workdir:
+        for concurrency in (int(value) for value in args.concurrency.split(',')):
+            results.append(run('cold', server, args.pages, concurrency))
+        # A second pass within the TTL reads everything back from the store
+        store = ProductStore(os.path.join(workdir, 'products.sqlite'))
+        top = max(int(value) for value in args.concurrency.split(','))
+        results.append(run('fill store', server, args.pages, top, store))
+        results.append(run('within ttl', server, args.pages, top, store))
+
+    for result in results:
+        print(f"{result['run']:>10} x{result['concurrency']:<3}: {result['products']} products in {result['seconds']}s "
+              f"({result['products_per_second']}/s), {result['detail_requests']} page requests, "
+              f"{result['mismatches']} mismatches")
+    print(json.dumps(results, indent=2))
+    if any(result['mismatches'] for result in results) or results[-1]['detail_requests']:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
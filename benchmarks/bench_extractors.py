@@ -0,0 +1,75 @@
+"""Check every product extractor against the BeautifulSoup reference and measure parse throughput.
+
+Runs over the saved rendered listing pages (or any directory of page_source dumps).
+
+Usage: python -m benchmarks.bench_extractors [--corpus DIR] [--repeat 20]
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.fixture_server import FIXTURE_DIR
+from extractors import EXTRACTORS, SoupExtractor, get_extractor
+
+def load_corpus(corpus_dir):
+    paths = sorted(glob.glob(os.path.join(corpus_dir, 'rendered_*.html')) or
+                   glob.glob(os.path.join(corpus_dir, '*.html')))
+    pages = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            pages.append(f.read())
+    return pages
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--corpus', default=FIXTURE_DIR)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus)
+    if not pages:
+        sys.exit(f"No pages found in {args.corpus}")
+
+    reference = [SoupExtractor().extract(page) for page in pages]
+    product_count = sum(len(records) for records in reference)
+
+    results = []
+    for name in EXTRACTORS:
+        try:
+            extractor = get_extractor(name)
+        except ImportError as e:
+            print(f"{name:>9}: skipped ({e})")
+            continue
+
+        mismatches = [i for i, page in enumerate(pages) if extractor.extract(page) != reference[i]]
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for page in pages:
+                extractor.extract(page)
+        elapsed = time.perf_counter() - start
+
+        pages_parsed = len(pages) * args.repeat
+        results.append({
+            'extractor': name,
+            'identical': not mismatches,
+            'pages_per_second': round(pages_parsed / elapsed, 1),
+            'products_per_second': round(product_count * args.repeat / elapsed, 1),
+            'ms_per_page': round(elapsed * 1000 / pages_parsed, 3),
+        })
+        status = 'identical' if not mismatches else f"MISMATCH on pages {mismatches}"
+        print(f"{name:>9}: {results[-1]['ms_per_page']} ms/page, "
+              f"{results[-1]['pages_per_second']} pages/s, {status}")
+
+    print(json.dumps(results, indent=2))
+    if any(not result['identical'] for result in results):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""Benchmark the scraping pipeline offline, stage by stage and end to end.
+
+Every stage runs in its own interpreter against the local fixture server, so peak RSS is
+per stage. Stages:
+
+  fetch       HTTP GET of each listing page (pays the injected latency)
+  parse       page source -> product nodes with the selected extractor
+  extract     product nodes -> ProductRecords
+  embedded    window.__myx state -> ProductRecords (what the http backend does)
+  write-FMT   append each page's records to a csv / ndjson / parquet sink
+  end-to-end  scrape_myntra with the http backend, written to csv
+
+Usage: python -m benchmarks.bench_pipeline [--pages 30] [--latency 0.05] [--output run.json]
+                                           [--baseline previous.json]
+"""
+import argparse
+import json
+import math
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STAGES = ('fetch', 'parse', 'extract', 'embedded', 'write-csv', 'write-ndjson', 'write-parquet', 'end-to-end')
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+def _timed(items, func):
+    latencies = []
+    results = []
+    for item in items:
+        start = time.perf_counter()
+        results.append(func(item))
+        latencies.append(time.perf_counter() - start)
+    return latencies, results
+
+def _pages(prefix, count):
+    from benchmarks.fixture_server import load_fixtures
+
+    fixtures = [page.decode('utf-8') for page in load_fixtures(prefix)]
+    return [fixtures[i % len(fixtures)] for i in range(count)]
+
+def run_stage(stage, pages, base_url, extractor_name, workers):
+    """Run one stage in this process; returns (per-page latencies, products, wall seconds)"""
+    sys.path.insert(0, REPO_ROOT)
+    import logging
+
+    logging.disable(logging.CRITICAL)
+    from extractors import get_extractor
+    from product_records import ProductRecord
+
+    start = time.perf_counter()
+    if stage == 'fetch':
+        from http_backend import HttpFetcher
+        from modified_myntra_scraper import search_url
+
+        fetcher = HttpFetcher(pool_size=1)
+        urls = [search_url('tshirts', page_no, base_url) for page_no in range(1, pages + 1)]
+        start = time.perf_counter()
+        latencies, bodies = _timed(urls, fetcher.fetch)
+        fetcher.close()
+        products = sum(body.count('class="product-base"') for body in bodies)
+    elif stage in ('parse', 'extract'):
+        extractor = get_extractor(extractor_name)
+        sources = _pages('rendered', pages)
+        if stage == 'parse':
+            start = time.perf_counter()
+            latencies, nodes = _timed(sources, lambda source: list(extractor.products(source)))
+        else:
+            # Parse outside the timer so only the per-field work is measured
+            parsed = [list(extractor.products(source)) for source in sources]
+            start = time.perf_counter()
+            latencies, nodes = _timed(parsed, lambda page: [ProductRecord.from_fields(*extractor.iter_fields(node))
+                                                            for node in page])
+        products = sum(len(page) for page in nodes)
+    elif stage == 'embedded':
+        from http_backend import extract_embedded_products
+
+        sources = _pages('listing', pages)
+        start = time.perf_counter()
+        latencies, records = _timed(sources, extract_embedded_products)
+        products = sum(len(page) for page in records)
+    elif stage.startswith('write-'):
+        from sinks import FORMAT_EXTENSIONS, open_sink
+
+        output_format = stage[len('write-'):]
+        extractor = get_extractor(extractor_name)
+        records = [extractor.extract(source) for source in _pages('rendered', pages)]
+        sink = open_sink('bench' + FORMAT_EXTENSIONS[output_format], output_format)
+        start = time.perf_counter()
+        latencies, _ = _timed(list(enumerate(records, 1)), lambda item: sink.write_page(*item))
+        sink.close()
+        products = sum(len(page) for page in records)
+    elif stage == 'end-to-end':
+        import modified_myntra_scraper
+        from run_catalog import RunCatalog
+
+        marks = []
+        start = time.perf_counter()
+        df = modified_myntra_scraper.scrape_myntra(
+            'tshirts', no_of_pages=pages, workers=workers, min_interval=0, base_url=base_url, backend='http',
+            output_format='csv', collect=False, adaptive=False, product_store=False, raise_errors=True,
+            catalog=RunCatalog('runs.sqlite'), on_page=lambda page_no, rows: marks.append(time.perf_counter())
+        )
+        # Pages are written in order, so the gap between writes is the per-page latency the caller sees
+        latencies = [later - earlier for earlier, later in zip([start] + marks, marks)]
+        products = df.attrs['rows_written']
+    else:
+        raise ValueError(f"Unknown stage '{stage}', expected one of {STAGES}")
+    return latencies, products, time.perf_counter() - start
+
+def measure(stage, pages, base_url, extractor_name, workers):
+    latencies, products, wall = run_stage(stage, pages, base_url, extractor_name, workers)
+    # ru_maxrss is KiB on Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {
+        'stage': stage,
+        'pages': len(latencies),
+        'products': products,
+        'seconds': round(wall, 4),
+        'pages_per_second': round(len(latencies) / wall, 1) if wall else None,
+        'products_per_second': round(products / wall, 1) if wall else None,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'peak_rss_mb': round(peak_rss_mb, 1),
+    }
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline):
+    """Print throughput and p95 changes against a previous run's JSON"""
+    previous = {result['stage']: result for result in baseline.get('results', [])}
+    print(f"Compared with {baseline.get('revision') or 'baseline'}:", file=sys.stderr)
+    for result in results:
+        old = previous.get(result['stage'])
+        if not old or not old.get('pages_per_second') or not old.get('p95_ms'):
+            continue
+        throughput = (result['pages_per_second'] / old['pages_per_second'] - 1) * 100
+        p95 = (result['p95_ms'] / old['p95_ms'] - 1) * 100
+        print(f"{result['stage']:>13}: throughput {throughput:+.1f}%, p95 {p95:+.1f}%", file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=30)
+    parser.add_argument('--latency', type=float, default=0.05, help="Seconds added to every fixture response")
+    parser.add_argument('--stages', default=','.join(STAGES))
+    parser.add_argument('--extractor', default='auto')
+    parser.add_argument('--workers', type=int, default=4, help="Page workers for the end-to-end stage")
+    parser.add_argument('--output', help="Also write the JSON results to this file")
+    parser.add_argument('--baseline', help="JSON results of an earlier run to compare against")
+    parser.add_argument('--run-stage', help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_stage:
+        print(json.dumps(measure(args.run_stage, args.pages, args.base_url, args.extractor, args.workers)))
+        return
+
+    from benchmarks.fixture_server import FixtureServer
+
+    results = []
+    with FixtureServer(latency=args.latency) as server, tempfile.TemporaryDirectory() as workdir:
+        for stage in args.stages.split(','):
+            env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+            proc = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_pipeline', '--run-stage', stage, '--pages', str(args.pages),
+                 '--base-url', server.base_url, '--extractor', args.extractor, '--workers', str(args.workers)],
+                cwd=workdir, env=env, capture_output=True, text=True
+            )
+            if proc.returncode != 0:
+                print(f"{stage}: failed\n{proc.stderr[-2000:]}", file=sys.stderr)
+                continue
+            result = json.loads(proc.stdout.strip().splitlines()[-1])
+            results.append(result)
+            print(f"{stage:>13}: {result['pages_per_second']} pages/s, p50 {result['p50_ms']} ms, "
+                  f"p95 {result['p95_ms']} ms, {result['peak_rss_mb']} MB peak RSS", file=sys.stderr)
+
+    report = {
+        'revision': git_revision(),
+        'created_at': time.time(),
+        'config': {'pages': args.pages, 'latency': args.latency, 'extractor': args.extractor,
+                   'workers': args.workers},
+        'results': results,
+    }
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            compare(results, json.load(f))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""Local HTTP server that serves the saved listing fixtures in place of www.myntra.com"""
+import glob
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+def load_fixtures(prefix='listing', fixture_dir=FIXTURE_DIR):
+    """Return the fixture pages for prefix, ordered by page number"""
+    pattern = re.compile(fr'{prefix}_p(\d+)\.html$')
+    pages = {}
+    for path in glob.glob(os.path.join(fixture_dir, f"{prefix}_p*.html")):
+        match = pattern.search(path)
+        if match:
+            with open(path, 'rb') as f:
+                pages[int(match.group(1))] = f.read()
+    return [pages[n] for n in sorted(pages)]
+
+# A results page past the end of the search: no cards and nothing to hydrate
+EMPTY_PAGE = (b'<!DOCTYPE html><html><head><meta charset="utf-8"></head><body>'
+              b'<script>window.__myx = {"searchData": {"results": {"totalCount": 0, "products": []}}}</script>'
+              b'<div class="search-searchProductsContainer"><ul class="results-base"></ul></div></body></html>')
+
+PAST_END_MODES = ('cycle', 'repeat', 'empty')
+
+# Subresources referenced by the heavy fixture pages (see make_fixtures.heavy_page): /static/<name>.<ext>
+STATIC_PREFIX = '/static/'
+ASSET_TYPES = {
+    '.jpg': ('image/jpeg', 60 * 1024),
+    '.gif': ('image/gif', 43),
+    '.woff2': ('font/woff2', 40 * 1024),
+    '.mp4': ('video/mp4', 1536 * 1024),
+}
+STATIC_TEXT = {
+    'fonts.css': ('text/css', ''.join(
+        f"@font-face{{font-family:f{i};src:url(/static/font-{i}.woff2) format('woff2')}}" for i in range(3)
+    ) + "body{font-family:f0}h3{font-family:f1}h4{font-family:f2}"),
+    # First-party tag that fires a tracking pixel, like the analytics scripts on the live site
+    'tracker.js': ('application/javascript', "new Image().src='/static/pixel.gif?t='+Date.now();"),
+}
+
+# Product pages: .../<product id>/buy, generated from the id (see detail_page)
+DETAIL_PATH = re.compile(r'/(\d+)/buy/?$')
+DETAIL_SIZES = ('XS', 'S', 'M', 'L', 'XL', 'XXL')
+DETAIL_SELLERS = ('Truenet Commerce', 'Omnitech Retail', 'Flashtech Retail')
+
+def detail_values(product_id):
+    """What a product page for product_id shows - the expected enrichment result"""
+    available = [label for i, label in enumerate(DETAIL_SIZES) if (product_id + i) % 3 != 0]
+    return {
+        'sizes': "Sizes: " + ", ".join(available),
+        'rating': round(3 + product_id % 20 / 10, 1),
+        'rating_count': product_id % 5000,
+        'seller': DETAIL_SELLERS[product_id % len(DETAIL_SELLERS)],
+    }
+
+def detail_page(product_id):
+    """Product page with its embedded window.__myx pdpData state, like the live site serves"""
+    values = detail_values(product_id)
+    available = set(values['sizes'][len("Sizes: "):].split(", "))
+    state = {'pdpData': {
+        'id': product_id,
+        'ratings': {'averageRating': values['rating'], 'totalCount': values['rating_count']},
+        'sizes': [{'label': label, 'available': label in available} for label in DETAIL_SIZES],
+        'sellers': [{'sellerPartnerId': product_id % 1000, 'sellerName': values['seller']}],
+    }}
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"></head><body>'
+            f'<script>window.__myx = {json.dumps(state)}</script>'
+            f'<div class="pdp-details"></div></body></html>').encode('utf-8')
+
+class _Server(ThreadingHTTPServer):
+    # The default backlog of 5 drops connections when many clients connect at once, costing a 1s SYN retry
+    request_queue_size = 128
+    daemon_threads = True
+
+class FixtureServer:
+    """Serve /<term>?p=N from the fixture pages, with an optional injected latency.
+
+    Requests past the last fixture are answered according to past_end: 'cycle' through the
+    pages again, 'repeat' the last page, or serve an 'empty' results page. Product links
+    (/.../<id>/buy) get a generated product page, or a 500 for ids in failing_details.
+    """
+
+    def __init__(self, pages=None, latency=0.0, host='127.0.0.1', port=0, past_end='cycle', failing_details=()):
+        if past_end not in PAST_END_MODES:
+            raise ValueError(f"Unknown past_end mode '{past_end}', expected one of {PAST_END_MODES}")
+        self.pages = pages if pages is not None else load_fixtures()
+        self.latency = latency
+        self.past_end = past_end
+        self.request_count = 0
+        self.bytes_sent = 0
+        self.asset_requests = 0
+        self.detail_requests = 0
+        self.failing_details = set(failing_details)
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), self._handler_class())
+        self._thread = None
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                detail = DETAIL_PATH.search(url.path)
+                if detail:
+                    product_id = int(detail.group(1))
+                    with server._lock:
+                        server.detail_requests += 1
+                    if product_id in server.failing_details:
+                        self.send_error(500)
+                        return
+                    content_type, body = 'text/html; charset=utf-8', detail_page(product_id)
+                elif url.path.startswith(STATIC_PREFIX):
+                    content_type, body = server.asset(url.path[len(STATIC_PREFIX):])
+                    if body is None:
+                        self.send_error(404)
+                        return
+                else:
+                    query = parse_qs(url.query)
+                    page_no = int(query.get('p', ['1'])[0])
+                    content_type, body = 'text/html; charset=utf-8', server.page(page_no)
+                if server.latency:
+                    time.sleep(server.latency)
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with server._lock:
+                    server.request_count += 1
+                    server.bytes_sent += len(body)
+                    if url.path.startswith(STATIC_PREFIX):
+                        server.asset_requests += 1
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def page(self, page_no):
+        if page_no <= len(self.pages) or self.past_end == 'cycle':
+            return self.pages[(page_no - 1) % len(self.pages)]
+        return self.pages[-1] if self.past_end == 'repeat' else EMPTY_PAGE
+
+    def asset(self, name):
+        """(content type, body) for a static asset, with a synthetic body of a realistic size"""
+        if name in STATIC_TEXT:
+            content_type, text = STATIC_TEXT[name]
+            return content_type, text.encode('utf-8')
+        content_type, size = ASSET_TYPES.get(os.path.splitext(name)[1], (None, 0))
+        if content_type is None:
+            return None, None
+        return content_type, b'\0' * size
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
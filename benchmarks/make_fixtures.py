@@ -0,0 +1,131 @@
+"""Generate the synthetic Myntra listing pages used by the benchmarks.
+
+Each page is written twice: listing_p<N>.html is what the server sends (embedded
+window.__myx state plus a small hydration script, like the live site) and
+rendered_p<N>.html is the page_source Chrome returns once the cards are rendered.
+
+Usage: python -m benchmarks.make_fixtures [--pages 3] [--products 50]
+"""
+import argparse
+import html
+import json
+import os
+import random
+import re
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+BRANDS = ['Roadster', 'HRX by Hrithik Roshan', 'WROGN', 'Puma', 'U.S. Polo Assn.', 'Levis', 'H&M', 'Mast & Harbour']
+ITEMS = ['Printed Round Neck T-shirt', 'Solid Polo Collar T-shirt', 'Slim Fit Casual Shirt',
+         'Striped Pure Cotton T-shirt', 'Typography Printed Oversized T-shirt', 'Henley Neck T-shirt']
+SIZES = ['S,M,L,XL', 'M,L', 'XS,S,M,L,XL,XXL', '', 'L']
+
+HYDRATE_SCRIPT = """
+<script>
+(function () {
+  var list = document.querySelector('ul.results-base');
+  var products = window.__myx.searchData.results.products;
+  var esc = function (s) { var d = document.createElement('div'); d.textContent = s; return d.innerHTML; };
+  list.innerHTML = products.map(function (p) {
+    var price = p.mrp !== p.price
+      ? '<span><span class="product-discountedPrice">Rs. ' + p.price + '</span><span class="product-strike">Rs. ' + p.mrp +
+        '</span></span><span class="product-discountPercentage">' + p.discountDisplayLabel + '</span>'
+      : '<span>Rs. ' + p.price + '</span>';
+    var sizes = p.sizes ? '<h4 class="product-sizes">Sizes: ' + p.sizes.split(',').join(', ') + '</h4>' : '';
+    return '<li class="product-base" id="' + p.productId + '"><a data-refreshpage="true" target="_blank" href="' +
+      esc(p.landingPageUrl) + '"><div class="product-productMetaInfo"><h3 class="product-brand">' + esc(p.brand) +
+      '</h3><h4 class="product-product">' + esc(p.additionalInfo) + '</h4>' + sizes +
+      '<div class="product-price">' + price + '</div></div></a></li>';
+  }).join('');
+})();
+</script>
+"""
+
+def make_products(page_no, count, search_term='tshirts'):
+    rng = random.Random(page_no)
+    products = []
+    for i in range(count):
+        product_id = 20000000 + page_no * 1000 + i
+        brand = rng.choice(BRANDS)
+        info = f"Men {rng.choice(ITEMS)}"
+        mrp = rng.randrange(499, 3999, 50)
+        discount = rng.choice([0, 0, 30, 40, 50, 60, 70])
+        price = mrp - mrp * discount // 100
+        slug = '-'.join(info.lower().split())
+        products.append({
+            'productId': product_id,
+            'productName': f"{brand} {info}",
+            'brand': brand,
+            'additionalInfo': info,
+            'price': price,
+            'mrp': mrp,
+            'discountDisplayLabel': f"({discount}% OFF)" if discount else "",
+            'sizes': rng.choice(SIZES),
+            'rating': round(rng.uniform(3.0, 4.9), 1),
+            'ratingCount': rng.randint(0, 5000),
+            'landingPageUrl': f"{search_term}/{brand.lower().replace(' ', '-')}/{slug}/{product_id}/buy",
+        })
+    return products
+
+def render_card(product):
+    esc = html.escape
+    if product['mrp'] != product['price']:
+        price = (f'<span><span class="product-discountedPrice">Rs. {product["price"]}</span>'
+                 f'<span class="product-strike">Rs. {product["mrp"]}</span></span>'
+                 f'<span class="product-discountPercentage">{product["discountDisplayLabel"]}</span>')
+    else:
+        price = f'<span>Rs. {product["price"]}</span>'
+    sizes = (f'<h4 class="product-sizes">Sizes: {", ".join(product["sizes"].split(","))}</h4>'
+             if product['sizes'] else '')
+    return (f'<li class="product-base" id="{product["productId"]}"><a data-refreshpage="true" target="_blank" '
+            f'href="{esc(product["landingPageUrl"])}"><div class="product-productMetaInfo">'
+            f'<h3 class="product-brand">{esc(product["brand"])}</h3>'
+            f'<h4 class="product-product">{esc(product["additionalInfo"])}</h4>{sizes}'
+            f'<div class="product-price">{price}</div></div></a></li>')
+
+def page_html(products, total_count, rendered):
+    state = {'searchData': {'results': {'totalCount': total_count, 'products': products}}}
+    state_json = json.dumps(state).replace('</', '<\\/')
+    cards = ''.join(render_card(p) for p in products) if rendered else ''
+    hydrate = '' if rendered else HYDRATE_SCRIPT
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Tshirts - Buy Tshirts Online | Myntra</title>'
+            f'</head><body><div class="title-container"><h1 class="title-title">Tshirts</h1>'
+            f'<span class="title-count"> - {total_count} items</span></div>'
+            f'<script>window.__myx = {state_json}</script>'
+            f'<div class="search-searchProductsContainer"><ul class="results-base">{cards}</ul></div>'
+            f'{hydrate}</body></html>')
+
+def heavy_page(page):
+    """Dress a fixture page up with what a live listing page also loads: web fonts, a tracker,
+    a promo video and one image per product card, all served from FixtureServer's /static/"""
+    if isinstance(page, bytes):
+        return heavy_page(page.decode('utf-8')).encode('utf-8')
+    head = ('<link rel="stylesheet" href="/static/fonts.css">'
+            '<script src="/static/tracker.js"></script>')
+    banner = '<video autoplay muted src="/static/promo.mp4"></video>'
+    page = page.replace('</head>', head + '</head>', 1)
+    page = page.replace('<div class="search-searchProductsContainer">',
+                        banner + '<div class="search-searchProductsContainer">', 1)
+    # Each card gets its image in front of the product metadata
+    page = re.sub(r'(<li class="product-base" id="(\d+)"><a [^>]*>)',
+                  r'\1<picture><img src="/static/img-\2.jpg"></picture>', page)
+    return page
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=3)
+    parser.add_argument('--products', type=int, default=50)
+    args = parser.parse_args()
+
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    total_count = args.pages * args.products
+    for page_no in range(1, args.pages + 1):
+        products = make_products(page_no, args.products)
+        for prefix, rendered in (('listing', False), ('rendered', True)):
+            path = os.path.join(FIXTURE_DIR, f"{prefix}_p{page_no}.html")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(page_html(products, total_count, rendered))
+            print(f"Wrote {path}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,341 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.service import Service
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_MAX_USES = 50  # Pages served by one browser before it is recycled
+DEFAULT_IDLE_TIMEOUT = 300.0  # Seconds an idle browser is kept before it is closed
+DRIVER_CACHE_PATH = os.environ.get(
+    'MYNTRA_DRIVER_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'myntra_scraper', 'chromedriver.json')
+)
+DRIVER_CACHE_MAX_AGE = 7 * 24 * 3600  # Re-check for a newer chromedriver once a week
+
+# 'default' is a normal headed Chrome; 'lean' is headless, stops waiting at DOMContentLoaded and
+# skips everything the scraper never reads (images, fonts, media, trackers)
+DEFAULT_PROFILE = 'default'
+PROFILES = ('default', 'lean')
+# Network.setBlockedURLs patterns for the lean profile - CDP blocks by URL, so resource types are matched on extension
+LEAN_BLOCKED_URLS = [
+    '*.jpg', '*.jpeg', '*.png', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*.mp4', '*.webm', '*.m3u8', '*.mp3',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*', '*facebook.net*',
+    '*connect.facebook.com*', '*hotjar.com*', '*clarity.ms*', '*branch.io*',
+]
+
+_driver_path_lock = threading.Lock()
+_driver_path = None
+
+def _read_driver_cache():
+    try:
+        with open(DRIVER_CACHE_PATH, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cache.get('path') and os.path.exists(cache['path']):
+        return cache
+    return None
+
+def _write_driver_cache(path):
+    try:
+        os.makedirs(os.path.dirname(DRIVER_CACHE_PATH), exist_ok=True)
+        with open(DRIVER_CACHE_PATH, 'w', encoding='utf-8') as f:
+            json.dump({'path': path, 'resolved_at': time.time()}, f)
+    except OSError as e:
+        logger.warning(f"Could not cache chromedriver path: {str(e)}")
+
+def resolve_driver_path():
+    """Locate chromedriver once per process, using a local cache so start-up works offline.
+
+    Order: CHROMEDRIVER_PATH env var, a fresh cached path, WebDriver Manager (network), a stale
+    cached path, and finally None to let Selenium Manager find a driver itself.
+    """
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is not None:
+            return _driver_path or None
+
+        path = os.environ.get('CHROMEDRIVER_PATH')
+        cache = _read_driver_cache()
+        if not path and cache and time.time() - cache.get('resolved_at', 0) < DRIVER_CACHE_MAX_AGE:
+            path = cache['path']
+            logger.info(f"Using cached chromedriver: {path}")
+        if not path:
+            try:
+                from webdriver_manager.chrome import ChromeDriverManager
+                path = ChromeDriverManager().install()
+                _write_driver_cache(path)
+                logger.info(f"Resolved chromedriver with WebDriver Manager: {path}")
+            except Exception as e:
+                logger.warning(f"WebDriver Manager lookup failed: {str(e)}")
+                if cache:
+                    path = cache['path']
+                    logger.info(f"Falling back to stale cached chromedriver: {path}")
+
+        _driver_path = path or ''
+        return path or None
+
+def create_driver(profile=None):
+    """Launch a Chrome WebDriver instance with the given profile (MYNTRA_BROWSER_PROFILE by default)"""
+    if profile is None:
+        profile = os.environ.get('MYNTRA_BROWSER_PROFILE', DEFAULT_PROFILE)
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown browser profile '{profile}', expected one of {PROFILES}")
+    options = webdriver.ChromeOptions()
+    # Uncomment the next line if you want to run Chrome in headless mode (the lean profile always is)
+    # options.add_argument('--headless')
+    if profile == 'lean':
+        options.add_argument('--headless=new')
+        options.add_argument('--window-size=1366,900')
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_argument('--disable-extensions')
+        options.add_argument('--mute-audio')
+        options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+        # driver.get returns at DOMContentLoaded; wait_for_page_ready takes it from there
+        options.page_load_strategy = 'eager'
+    driver_path = resolve_driver_path()
+    service = Service(driver_path) if driver_path else Service()
+    driver = webdriver.Chrome(service=service, options=options)
+    if profile == 'lean':
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': LEAN_BLOCKED_URLS})
+        except WebDriverException as e:
+            logger.warning(f"Could not enable request blocking: {str(e)}")
+    return driver
+
+def is_healthy(driver):
+    """Cheap liveness probe - a crashed browser or dead session raises here"""
+    try:
+        return driver.execute_script('return 1') == 1
+    except Exception:
+        return False
+
+class _PooledDriver:
+    __slots__ = ('driver', 'uses', 'last_used')
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.last_used = time.monotonic()
+
+class BrowserPool:
+    """Long-lived pool of browsers shared by every scrape in the process.
+
+    Browsers are leased one page at a time, health-checked before reuse, recycled after
+    max_uses pages and closed after idle_timeout seconds without work.
+    """
+
+    def __init__(self, size=DEFAULT_POOL_SIZE, driver_factory=create_driver, max_uses=DEFAULT_MAX_USES,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.size = size
+        self.driver_factory = driver_factory
+        self.max_uses = max_uses
+        self.idle_timeout = idle_timeout
+        self._idle = []
+        self._leased = {}
+        self._starting = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._reaper = None
+        self.created = 0
+        self.recycled = 0
+
+    @property
+    def total(self):
+        return len(self._idle) + len(self._leased) + self._starting
+
+    def _start_driver(self):
+        logger.info(f"Starting browser ({self.total} of {self.size} in pool)")
+        start = time.perf_counter()
+        pooled = _PooledDriver(self.driver_factory())
+        metrics.driver_starts.observe(time.perf_counter() - start)
+        return pooled
+
+    def _quit(self, pooled, reason):
+        logger.debug("Closing browser after %d uses (%s)", pooled.uses, reason)
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logger.error(f"Error closing WebDriver: {str(e)}")
+
+    def acquire(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Browser pool is closed")
+                    if self._idle:
+                        pooled = self._idle.pop()
+                        # Counted as leased while it is probed so the pool never over-allocates
+                        self._leased[id(pooled.driver)] = pooled
+                        start_new = False
+                        break
+                    if self.total < self.size:
+                        self._starting += 1
+                        start_new = True
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("Timed out waiting for a browser from the pool")
+                    self._cond.wait(remaining)
+
+            if start_new:
+                try:
+                    pooled = self._start_driver()
+                except BaseException:
+                    with self._cond:
+                        self._starting -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._starting -= 1
+                    self.created += 1
+                    self._leased[id(pooled.driver)] = pooled
+                return pooled.driver
+
+            # Reused browsers are probed first; a dead one is replaced on the next loop iteration
+            if is_healthy(pooled.driver):
+                return pooled.driver
+            with self._cond:
+                self._leased.pop(id(pooled.driver), None)
+                self.recycled += 1
+                self._cond.notify()
+            self._quit(pooled, 'failed health check')
+
+    def release(self, driver, broken=False):
+        with self._cond:
+            pooled = self._leased.pop(id(driver), None)
+            if pooled is None:
+                return
+            pooled.uses += 1
+            pooled.last_used = time.monotonic()
+            recycle = broken or self._closed or pooled.uses >= self.max_uses
+            if recycle:
+                self.recycled += 1
+            else:
+                self._idle.append(pooled)
+            self._cond.notify()
+        if recycle:
+            self._quit(pooled, 'broken' if broken else 'pool closed' if self._closed else 'max uses reached')
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """with pool.lease() as driver: ... - a browser that raises a WebDriver error is discarded"""
+        driver = self.acquire(timeout)
+        broken = False
+        try:
+            yield driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            self.release(driver, broken=broken)
+
+    def warm_up(self, count=None):
+        """Start browsers ahead of the first scrape (defaults to the full pool size)"""
+        target = self.size if count is None else min(count, self.size)
+        while True:
+            with self._cond:
+                if self._closed or self.total >= target:
+                    break
+                self._starting += 1
+            try:
+                pooled = self._start_driver()
+            except Exception as e:
+                logger.error(f"Browser pool warm-up failed: {str(e)}")
+                with self._cond:
+                    self._starting -= 1
+                    self._cond.notify()
+                break
+            with self._cond:
+                self._starting -= 1
+                self.created += 1
+                self._idle.append(pooled)
+                self._cond.notify()
+        logger.info(f"Browser pool warmed up with {len(self._idle)} idle browser(s)")
+
+    def evict_idle(self):
+        """Close browsers that have not been used for idle_timeout seconds"""
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._cond:
+            stale = [p for p in self._idle if p.last_used < cutoff]
+            self._idle = [p for p in self._idle if p.last_used >= cutoff]
+        for pooled in stale:
+            self._quit(pooled, 'idle timeout')
+        return len(stale)
+
+    def start_reaper(self, interval=30.0):
+        """Run evict_idle periodically in a daemon thread"""
+        if self._reaper is not None:
+            return
+
+        def reap():
+            while not self._closed:
+                time.sleep(interval)
+                evicted = self.evict_idle()
+                if evicted:
+                    logger.info(f"Evicted {evicted} idle browser(s)")
+
+        self._reaper = threading.Thread(target=reap, name='browser-pool-reaper', daemon=True)
+        self._reaper.start()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'size': self.size,
+                'idle': len(self._idle),
+                'leased': len(self._leased),
+                'created': self.created,
+                'recycled': self.recycled,
+            }
+
+    def close(self):
+        logger.info("Closing browser pool")
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        # Leased browsers are closed as they are released
+        for pooled in idle:
+            self._quit(pooled, 'pool closed')
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+def get_shared_pool():
+    """Process-wide pool used by the CLI and the Flask app, sized from MYNTRA_BROWSER_POOL_SIZE"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None or _shared_pool._closed:
+            _shared_pool = BrowserPool(
+                size=int(os.environ.get('MYNTRA_BROWSER_POOL_SIZE', DEFAULT_POOL_SIZE)),
+                max_uses=int(os.environ.get('MYNTRA_BROWSER_MAX_USES', DEFAULT_MAX_USES)),
+                idle_timeout=float(os.environ.get('MYNTRA_BROWSER_IDLE_TIMEOUT', DEFAULT_IDLE_TIMEOUT)),
+            )
+            _shared_pool.start_reaper()
+        return _shared_pool
+
+def shared_pool_stats():
+    """Stats of the shared pool, or None if no scrape has needed one yet"""
+    with _shared_pool_lock:
+        return _shared_pool.stats() if _shared_pool is not None else None
+
+def close_shared_pool():
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is not None:
+            _shared_pool.close()
+            _shared_pool = None
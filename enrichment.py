@@ -0,0 +1,139 @@
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+
+import metrics
+from http_backend import EMBEDDED_STATE_PATTERN, HttpFetcher
+from product_store import parse_product_id
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TTL = 24 * 3600  # Products enriched more recently than this are read back from the product store
+
+def parse_detail_page(html):
+    """Available sizes, rating, rating count and seller from a product page's embedded state, or None"""
+    match = EMBEDDED_STATE_PATTERN.search(html)
+    if not match:
+        return None
+    try:
+        pdp = json.loads(match.group(1))['pdpData']
+    except (ValueError, KeyError, TypeError) as e:
+        logger.debug("Product page state present but unusable: %s", e)
+        return None
+
+    sizes = [size['label'] for size in pdp.get('sizes') or [] if size.get('available') and size.get('label')]
+    ratings = pdp.get('ratings') or {}
+    sellers = pdp.get('sellers') or []
+    rating = ratings.get('averageRating')
+    rating_count = ratings.get('totalCount')
+    return {
+        'sizes': "Sizes: " + ", ".join(sizes) if sizes else None,
+        # Unrated products report an average of 0
+        'rating': round(float(rating), 2) if rating else None,
+        'rating_count': int(rating_count) if rating_count is not None else None,
+        'seller': sellers[0].get('sellerName') if sellers else None,
+    }
+
+def merge_details(record, details):
+    """Fill a record from product-page details; the card's sizes are kept when the page lists none in stock"""
+    if details.get('sizes'):
+        record.sizes = details['sizes']
+    for name in ('rating', 'rating_count', 'seller'):
+        if details.get(name) is not None:
+            setattr(record, name, details[name])
+
+def detail_url(product_url, base_url=None):
+    """Where to fetch a product page; base_url points the request at another host, e.g. a local stand-in"""
+    if not base_url:
+        return product_url
+    parts = urlsplit(product_url)
+    return base_url.rstrip('/') + parts.path + (f"?{parts.query}" if parts.query else '')
+
+class ProductEnricher:
+    """Fetch product detail pages for scraped records and merge sizes, ratings and seller into them.
+
+    At most `concurrency` pages are fetched at once, over pooled keep-alive sessions
+    (MYNTRA_ENRICH_CONCURRENCY), and every fetch first waits on `rate_limiter` when one is given -
+    a scrape passes its own, so product pages count against the same politeness limit as the
+    listing pages. With a product store, details fetched less than `ttl` seconds ago
+    (MYNTRA_ENRICH_TTL) are reused instead of fetched again.
+    """
+
+    def __init__(self, concurrency=None, ttl=None, store=None, base_url=None, timeout=10, rate_limiter=None):
+        if concurrency is None:
+            concurrency = int(os.environ.get('MYNTRA_ENRICH_CONCURRENCY', DEFAULT_CONCURRENCY))
+        if ttl is None:
+            ttl = float(os.environ.get('MYNTRA_ENRICH_TTL', DEFAULT_TTL))
+        self.concurrency = max(1, concurrency)
+        self.ttl = ttl
+        self.store = store
+        self.base_url = base_url
+        self.rate_limiter = rate_limiter
+        self._fetcher = HttpFetcher(pool_size=self.concurrency, timeout=timeout)
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='enrich')
+
+    def _fetch(self, url):
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait()
+        try:
+            html = self._fetcher.fetch(url)
+        except requests.RequestException as e:
+            logger.warning(f"Product page fetch failed for {url}: {str(e)}")
+            return None
+        details = parse_detail_page(html)
+        if details is None:
+            logger.info("No product details found at %s", url)
+        return details
+
+    def enrich(self, records):
+        """Merge product-page details into records in place.
+
+        Returns counts of products fetched, reused from the store and failed.
+        """
+        by_url = {}
+        for record in records:
+            if record.product_url and record.product_url != "N/A":
+                by_url.setdefault(record.product_url, []).append(record)
+        product_ids = {url: parse_product_id(url) for url in by_url}
+
+        details = {}
+        if self.store and self.ttl > 0:
+            known = [product_id for product_id in product_ids.values() if product_id is not None]
+            fresh = self.store.fresh_details(known, since=time.time() - self.ttl)
+            details = {url: fresh[product_id] for url, product_id in product_ids.items() if product_id in fresh}
+        cached = len(details)
+
+        # Every page is in flight before the first result is awaited
+        futures = {url: self._executor.submit(self._fetch, detail_url(url, self.base_url))
+                   for url in by_url if url not in details}
+        fetched = []
+        for url, future in futures.items():
+            result = future.result()
+            if result is not None:
+                details[url] = result
+                fetched.append(url)
+        failed = len(futures) - len(fetched)
+
+        for url, found in details.items():
+            for record in by_url[url]:
+                merge_details(record, found)
+        if self.store and fetched:
+            self.store.save_details([(product_ids[url], details[url]) for url in fetched
+                                     if product_ids[url] is not None])
+
+        metrics.enrichments.inc(len(fetched), result='fetched')
+        metrics.enrichments.inc(cached, result='cached')
+        metrics.enrichments.inc(failed, result='failed')
+        logger.debug("Enriched %d products (%d fetched, %d from the store, %d failed)",
+                     len(fetched) + cached, len(fetched), cached, failed)
+        return {'fetched': len(fetched), 'cached': cached, 'failed': failed}
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._fetcher.close()
@@ -0,0 +1,240 @@
+import csv
+import glob
+import hashlib
+import io
+import json
+import logging
+import os
+import uuid
+import zlib
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional - only needed for parquet exports
+    pa = None
+    pq = None
+
+from analytics import INTEGER_COLUMNS
+from product_records import COLUMNS
+from sinks import parquet_schema, progress_path
+
+logger = logging.getLogger(__name__)
+
+# Export format -> (mimetype, file extension)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', '.csv'),
+    'csv.gz': ('application/gzip', '.csv.gz'),
+    'ndjson': ('application/x-ndjson', '.ndjson'),
+    'parquet': ('application/vnd.apache.parquet', '.parquet'),
+}
+# Accept header values that select a format, besides the mimetypes above
+ACCEPT_ALIASES = {
+    'application/x-gzip': 'csv.gz',
+    'application/jsonl': 'ndjson',
+    'application/x-parquet': 'parquet',
+}
+EXPORT_CACHE_DIR = os.environ.get('MYNTRA_EXPORT_CACHE', os.path.join('csv_data', '.exports'))
+BATCH_ROWS = 5000
+
+def stored_format(path):
+    """Format a scrape output was written in, from its extension"""
+    for name in ('csv', 'ndjson', 'parquet'):
+        if path.endswith(EXPORT_FORMATS[name][1]):
+            return name
+    return None
+
+def available_formats():
+    """Export formats this installation can produce - parquet needs pyarrow"""
+    return tuple(name for name in EXPORT_FORMATS if name != 'parquet' or pa is not None)
+
+def negotiate_format(requested, accept, default):
+    """Pick the export format from ?format=, then the Accept header, then default.
+
+    None if the format is unknown or cannot be produced here, so the request can be refused
+    before any of the response is sent.
+    """
+    available = available_formats()
+    if requested:
+        return requested if requested in available else None
+    by_mimetype = {EXPORT_FORMATS[name][0]: name for name in available}
+    by_mimetype.update({value: name for value, name in ACCEPT_ALIASES.items() if name in available})
+    # Accept values come highest quality first
+    for value, quality in accept:
+        if quality <= 0:
+            continue
+        if value in by_mimetype:
+            return by_mimetype[value]
+        if value in ('*/*', 'application/*', 'text/*'):
+            return default
+    return default if not accept else None
+
+def _source_files(path):
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, 'part-*.parquet')))
+    return [path]
+
+def export_etag(path, export_format):
+    """Strong validator for an export: changes whenever any source file changes"""
+    digest = hashlib.sha1(export_format.encode('utf-8'))
+    for source in _source_files(path):
+        stat = os.stat(source)
+        digest.update(f"{os.path.basename(source)}:{stat.st_size}:{stat.st_mtime_ns};".encode('utf-8'))
+    return digest.hexdigest()[:24]
+
+def is_complete(path):
+    """False while a scrape is still writing to path"""
+    return not os.path.exists(progress_path(path))
+
+def iter_frames(path, batch_rows=BATCH_ROWS):
+    """Read a scrape output in DataFrame batches, whatever format it was stored in"""
+    source_format = stored_format(path)
+    if source_format == 'parquet':
+        # One part file per scraped page, so batches are already small
+        for part in _source_files(path):
+            yield pd.read_parquet(part)
+        return
+    if source_format == 'ndjson':
+        reader = pd.read_json(path, lines=True, chunksize=batch_rows)
+    else:
+        reader = pd.read_csv(path, chunksize=batch_rows)
+    with reader:
+        for frame in reader:
+            yield frame
+
+def normalize_frame(frame):
+    """Frame with exactly the output columns in order and integral (nullable) price and count columns"""
+    frame = frame.reindex(columns=list(COLUMNS))
+    for column in INTEGER_COLUMNS:
+        frame[column] = pd.to_numeric(frame[column], errors='coerce').round().astype('Int64')
+    return frame
+
+def _rows(frame):
+    for row in frame.itertuples(index=False, name=None):
+        yield [None if pd.isna(value) else value for value in row]
+
+def _iter_csv(frames):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for frame in frames:
+        writer.writerows(['' if value is None else value for value in row] for row in _rows(frame))
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+def _iter_gzip(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def _iter_ndjson(frames):
+    for frame in frames:
+        lines = [json.dumps(dict(zip(COLUMNS, row)), ensure_ascii=False, default=int) for row in _rows(frame)]
+        if lines:
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+class _ChunkWriter(io.RawIOBase):
+    """Write-only file that hands written bytes back to the generator instead of keeping them"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def _iter_parquet(frames):
+    if pa is None:
+        raise ImportError("Parquet exports require the pyarrow package")
+    schema = parquet_schema()
+    out = _ChunkWriter()
+    # One row group per batch; only the footer has to wait for the end
+    writer = pq.ParquetWriter(out, schema)
+    for frame in frames:
+        writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+        data = out.drain()
+        if data:
+            yield data
+    writer.close()
+    yield out.drain()
+
+def iter_export(path, export_format, batch_rows=BATCH_ROWS):
+    """Generate the export of a scrape output as byte chunks, one batch of rows at a time"""
+    frames = (normalize_frame(frame) for frame in iter_frames(path, batch_rows))
+    if export_format == 'csv':
+        return _iter_csv(frames)
+    if export_format == 'csv.gz':
+        return _iter_gzip(_iter_csv(frames))
+    if export_format == 'ndjson':
+        return _iter_ndjson(frames)
+    if export_format == 'parquet':
+        return _iter_parquet(frames)
+    raise ValueError(f"Unknown export format '{export_format}', expected one of {tuple(EXPORT_FORMATS)}")
+
+def cached_export_path(path, export_format, etag):
+    name = os.path.basename(os.path.normpath(path))
+    return os.path.join(EXPORT_CACHE_DIR, f"{name}.{etag}{EXPORT_FORMATS[export_format][1]}")
+
+def stream_export(path, export_format, etag):
+    """Yield the export while also writing it to the export cache.
+
+    The cache file only appears once the whole export has been generated, so an aborted
+    download never leaves a truncated file behind; later requests (and Range requests) are
+    then served straight from disk.
+    """
+    cache_path = cached_export_path(path, export_format, etag)
+    os.makedirs(EXPORT_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{cache_path}.{uuid.uuid4().hex}.tmp"
+    complete = False
+    try:
+        with open(tmp_path, 'wb') as f:
+            for chunk in iter_export(path, export_format):
+                f.write(chunk)
+                yield chunk
+        os.replace(tmp_path, cache_path)
+        complete = True
+        _prune_cache(path, export_format, keep=cache_path)
+    finally:
+        if not complete and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def build_export(path, export_format, etag):
+    """Generate the export into the cache (without holding it in memory) and return its path"""
+    cache_path = cached_export_path(path, export_format, etag)
+    if not os.path.exists(cache_path):
+        for _ in stream_export(path, export_format, etag):
+            pass
+    return cache_path
+
+def _prune_cache(path, export_format, keep):
+    # Exports of older versions of the same output are never served again
+    name = os.path.basename(os.path.normpath(path))
+    pattern = os.path.join(EXPORT_CACHE_DIR, f"{glob.escape(name)}.*{EXPORT_FORMATS[export_format][1]}")
+    for stale in glob.glob(pattern):
+        if stale != keep and not stale.endswith('.tmp'):
+            try:
+                os.remove(stale)
+            except OSError as e:
+                logger.warning(f"Could not remove stale export {stale}: {str(e)}")
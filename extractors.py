@@ -0,0 +1,221 @@
+import logging
+import os
+import re
+import threading
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:  # lxml is optional - the BeautifulSoup extractors work without it
+    etree = None
+    lxml_html = None
+
+from http_backend import product_link
+from product_records import ProductRecord
+
+logger = logging.getLogger(__name__)
+
+# Raw listing-card fields, in the order iter_fields yields them
+FIELDS = ('brand_name', 'price', 'original_price', 'description', 'sizes', 'product_url')
+
+# Total number of search results: the embedded window.__myx state, else the "- 1234 items" title count
+TOTAL_COUNT_PATTERNS = (
+    re.compile(r'"totalCount"\s*:\s*(\d+)'),
+    re.compile(r'class="title-count"[^>]*>\s*-?\s*([\d,]+)\s*item'),
+)
+
+class ProductExtractor:
+    """Turns a listing page into product records; subclasses only implement how a page is split and read"""
+
+    name = None
+
+    def products(self, page_source):
+        """Return the li.product-base nodes of the page"""
+        raise NotImplementedError
+
+    def iter_fields(self, product):
+        """Yield the raw field values of one product node in FIELDS order"""
+        raise NotImplementedError
+
+    def extract(self, page_source):
+        return self.records(self.products(page_source))
+
+    def records(self, products):
+        """Build records from the nodes returned by products()"""
+        records = []
+        for product in products:
+            values = []
+            try:
+                for value in self.iter_fields(product):
+                    values.append(value)
+            except Exception as e:
+                logger.error("Error extracting data from product: %s", e)
+                # Pad the fields we could not read, unless nothing was read at all
+                if not values:
+                    continue
+                values.extend(["N/A"] * (len(FIELDS) - len(values)))
+            records.append(ProductRecord.from_fields(*values))
+        return records
+
+def _clean_price(text):
+    # Remove 'Rs. ' from the price
+    return text.replace('Rs. ', '') if text != "N/A" else text
+
+class SoupExtractor(ProductExtractor):
+    """Reference extractor: full html.parser parse and one find() per field"""
+
+    name = 'soup'
+
+    def products(self, page_source):
+        soup = BeautifulSoup(page_source, 'html.parser')
+        return soup.find_all('li', class_='product-base')
+
+    def iter_fields(self, product):
+        # Extract brand
+        brand_elem = product.find('h3', class_='product-brand')
+        yield brand_elem.text.strip() if brand_elem else "N/A"
+
+        # Extract price
+        price_elem = product.find('span', class_='product-discountedPrice')
+        if not price_elem:
+            price_elem = product.find('div', class_='product-price')
+        yield _clean_price(price_elem.text.strip() if price_elem else "N/A")
+
+        # Extract original price
+        orig_price_elem = product.find('span', class_='product-strike')
+        yield _clean_price(orig_price_elem.text.strip() if orig_price_elem else "N/A")
+
+        # Extract product description
+        desc_elem = product.find('h4', class_='product-product')
+        yield desc_elem.text.strip() if desc_elem else "N/A"
+
+        # Extract sizes
+        sizes_elem = product.find('h4', class_='product-sizes')
+        yield sizes_elem.text.strip() if sizes_elem else "N/A"
+
+        # Extract product link
+        link_elem = product.find('a')
+        yield product_link(link_elem['href']) if link_elem and 'href' in link_elem.attrs else "N/A"
+
+# (tag, class) -> field slot, used by the single-pass walk below
+_FIELD_SLOTS = {
+    ('h3', 'product-brand'): 'brand',
+    ('span', 'product-discountedPrice'): 'discounted',
+    ('div', 'product-price'): 'price',
+    ('span', 'product-strike'): 'strike',
+    ('h4', 'product-product'): 'desc',
+    ('h4', 'product-sizes'): 'sizes',
+}
+
+def _has_product_base_class(value):
+    if not value:
+        return False
+    return 'product-base' in (value.split() if isinstance(value, str) else value)
+
+class StrainerExtractor(ProductExtractor):
+    """Only builds the product subtrees (SoupStrainer) and reads every field in one walk per product"""
+
+    name = 'strainer'
+
+    def products(self, page_source):
+        # The strainer sees the raw class attribute while parsing, so match on its split value
+        strainer = SoupStrainer('li', class_=_has_product_base_class)
+        soup = BeautifulSoup(page_source, 'html.parser', parse_only=strainer)
+        return soup.find_all('li', class_='product-base')
+
+    def iter_fields(self, product):
+        found = {}
+        for elem in product.descendants:
+            tag = elem.name
+            if tag is None:
+                continue
+            if tag == 'a':
+                found.setdefault('link', elem)
+                continue
+            for cls in elem.get('class') or ():
+                slot = _FIELD_SLOTS.get((tag, cls))
+                if slot is not None:
+                    found.setdefault(slot, elem)
+
+        def text(slot):
+            elem = found.get(slot)
+            return elem.text.strip() if elem is not None else "N/A"
+
+        yield text('brand')
+        yield _clean_price(text('discounted') if 'discounted' in found else text('price'))
+        yield _clean_price(text('strike'))
+        yield text('desc')
+        yield text('sizes')
+        link_elem = found.get('link')
+        yield product_link(link_elem['href']) if link_elem and 'href' in link_elem.attrs else "N/A"
+
+def _has_class(cls):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')"
+
+class LxmlExtractor(ProductExtractor):
+    """libxml2 parse with precompiled XPath selectors (requires lxml)"""
+
+    name = 'lxml'
+
+    def __init__(self):
+        if etree is None:
+            raise ImportError("The 'lxml' extractor requires the lxml package")
+        self._products = etree.XPath(f"//li[{_has_class('product-base')}]")
+        self._brand = etree.XPath(f"(.//h3[{_has_class('product-brand')}])[1]")
+        self._discounted = etree.XPath(f"(.//span[{_has_class('product-discountedPrice')}])[1]")
+        self._price = etree.XPath(f"(.//div[{_has_class('product-price')}])[1]")
+        self._strike = etree.XPath(f"(.//span[{_has_class('product-strike')}])[1]")
+        self._desc = etree.XPath(f"(.//h4[{_has_class('product-product')}])[1]")
+        self._sizes = etree.XPath(f"(.//h4[{_has_class('product-sizes')}])[1]")
+        self._link = etree.XPath("(.//a)[1]")
+
+    def products(self, page_source):
+        if not page_source.strip():
+            return []
+        return self._products(lxml_html.document_fromstring(page_source))
+
+    @staticmethod
+    def _text(matches):
+        return matches[0].text_content().strip() if matches else "N/A"
+
+    def iter_fields(self, product):
+        yield self._text(self._brand(product))
+        price = self._discounted(product) or self._price(product)
+        yield _clean_price(self._text(price))
+        yield _clean_price(self._text(self._strike(product)))
+        yield self._text(self._desc(product))
+        yield self._text(self._sizes(product))
+        link = self._link(product)
+        href = link[0].get('href') if link else None
+        yield product_link(href) if href is not None else "N/A"
+
+EXTRACTORS = {
+    SoupExtractor.name: SoupExtractor,
+    StrainerExtractor.name: StrainerExtractor,
+    LxmlExtractor.name: LxmlExtractor,
+}
+
+def extract_total_count(page_source):
+    """Total result count advertised by a listing page, or None when the page does not show one"""
+    for pattern in TOTAL_COUNT_PATTERNS:
+        match = pattern.search(page_source)
+        if match:
+            return int(match.group(1).replace(',', ''))
+    return None
+
+# Compiled XPath objects must not be shared between threads, so instances are cached per thread
+_local = threading.local()
+
+def get_extractor(name=None):
+    """Return this thread's extractor instance; 'auto' (the default) picks lxml when installed, else strainer"""
+    if name is None:
+        name = os.environ.get('MYNTRA_EXTRACTOR', 'auto')
+    if name == 'auto':
+        name = LxmlExtractor.name if etree is not None else StrainerExtractor.name
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown extractor '{name}', expected one of {tuple(EXTRACTORS)} or 'auto'")
+    instances = _local.__dict__.setdefault('instances', {})
+    if name not in instances:
+        instances[name] = EXTRACTORS[name]()
+    return instances[name]
@@ -0,0 +1,124 @@
+import json
+import logging
+import re
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import span
+from product_records import ProductRecord
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_URL_PREFIX = "https://www.myntra.com"
+
+# Browser-like headers - the listing endpoint serves a stripped page to unknown clients
+DEFAULT_HEADERS = {
+    'User-Agent': ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                   '(KHTML, like Gecko) Chrome/118.0 Safari/537.36'),
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+# Myntra ships the search results as server-rendered state: window.__myx = {...}</script>
+EMBEDDED_STATE_PATTERN = re.compile(r'window\.__myx\s*=\s*(\{.*?\})\s*;?\s*</script>', re.DOTALL)
+
+class HttpFetcher:
+    """Browserless page fetcher backed by pooled keep-alive sessions (one per worker thread)"""
+
+    def __init__(self, pool_size=10, timeout=15, headers=None):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.headers = dict(DEFAULT_HEADERS, **(headers or {}))
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update(self.headers)
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def fetch(self, url):
+        """Return the raw HTML for url"""
+        response = self._session().get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.text
+
+    def fetch_page(self, url, fallback_parser=None, timings=None):
+        """Fetch url and return (product records, raw HTML).
+
+        Records are None when the page has to be rendered in a browser; the HTML is None when the request failed.
+        """
+        try:
+            with span('fetch', timings):
+                html = self.fetch(url)
+        except requests.RequestException as e:
+            logger.warning(f"HTTP fetch failed for {url}: {str(e)}")
+            return None, None
+
+        with span('extract', timings):
+            records = extract_embedded_products(html)
+        if records is not None:
+            logger.debug("Extracted %d products from embedded state", len(records))
+            return records, html
+
+        # No embedded state - try the server-rendered markup before giving up
+        if fallback_parser is not None:
+            records = fallback_parser(html)
+            if records:
+                logger.debug("Extracted %d products from server-rendered HTML", len(records))
+                return records, html
+
+        logger.info("No products found in HTTP response for %s", url)
+        return None, html
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+
+def product_link(href):
+    """Absolute product URL for a listing link - cards link relative to the site root, usually without the leading slash"""
+    if href.startswith(('http://', 'https://')):
+        return href
+    return PRODUCT_URL_PREFIX + '/' + href.lstrip('/')
+
+def extract_embedded_products(html):
+    """Pull the product listing out of the embedded window.__myx state as ProductRecords"""
+    match = EMBEDDED_STATE_PATTERN.search(html)
+    if not match:
+        return None
+    try:
+        state = json.loads(match.group(1))
+        products = state['searchData']['results']['products']
+    except (ValueError, KeyError, TypeError) as e:
+        logger.debug("Embedded state present but unusable: %s", e)
+        return None
+
+    records = []
+    for product in products:
+        price = product.get('price')
+        mrp = product.get('mrp')
+        sizes = product.get('sizes')
+        link = product.get('landingPageUrl')
+        records.append(ProductRecord.from_fields(
+            product.get('brand') or "N/A",
+            price,
+            # The listing card only shows a struck-through price when the product is discounted
+            mrp if mrp != price else None,
+            product.get('additionalInfo') or product.get('productName') or "N/A",
+            "Sizes: " + ", ".join(sizes.split(',')) if sizes else "N/A",
+            product_link(link) if link else "N/A"
+        ))
+    return records
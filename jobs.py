@@ -0,0 +1,171 @@
+import logging
+import os
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from log_config import job_context
+from metrics import RunTimings
+from result_cache import ResultCache, normalize_search_term
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+class Job:
+    """State of one background scrape, updated by the worker and read by the status endpoint"""
+
+    def __init__(self, search_term, no_of_pages):
+        self.id = uuid.uuid4().hex
+        self.search_term = search_term
+        self.no_of_pages = no_of_pages
+        self.status = QUEUED
+        self.pages_done = 0
+        self.rows_written = 0
+        self.run_id = None
+        self.output_path = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cache_hits = 0
+        self.timings = RunTimings()
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+    def on_page(self, page_no, rows):
+        """Progress callback passed to scrape_myntra"""
+        self.pages_done += 1
+        self.rows_written += rows
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'search_term': self.search_term,
+            'status': self.status,
+            'pages_done': self.pages_done,
+            'no_of_pages': self.no_of_pages,
+            # A finished scrape may have stopped before no_of_pages when the results ran out
+            'progress': 1.0 if self.status == DONE or not self.no_of_pages
+                        else round(min(self.pages_done / self.no_of_pages, 1.0), 3),
+            'rows_written': self.rows_written,
+            'run_id': self.run_id,
+            'output_path': self.output_path,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'cache_hits': self.cache_hits,
+            'timings': self.timings.to_dict(),
+        }
+
+class JobManager:
+    """Bounded worker pool that runs scrape jobs in-process and keeps their status for polling.
+
+    Identical requests (same normalized term and page count) are coalesced: while a scrape is
+    queued or running, later requests get the same job, and a finished job is reused until its
+    cache entry expires unless force_refresh is set.
+    """
+
+    def __init__(self, scrape_func, max_workers=2, max_history=200, cache=None):
+        self.scrape_func = scrape_func
+        self.max_history = max_history
+        self.cache = cache if cache is not None else ResultCache(
+            ttl=float(os.environ.get('MYNTRA_CACHE_TTL', '900')),
+            max_entries=int(os.environ.get('MYNTRA_CACHE_SIZE', '128')),
+        )
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scrape-job')
+        self._jobs = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def submit(self, search_term, no_of_pages=10, force_refresh=False, **scrape_kwargs):
+        key = (normalize_search_term(search_term), no_of_pages)
+        with self._lock:
+            job = self._in_flight.get(key)
+            if job is not None:
+                # Single flight: join the scrape that is already queued or running
+                job.cache_hits += 1
+                logger.info(f"Joining in-flight job {job.id} for '{search_term}'")
+                return job
+            if force_refresh:
+                # The cached job only points at the output this scrape replaces
+                self.cache.invalidate(key)
+            else:
+                job = self.cache.get(key)
+                if job is not None and job.output_path and os.path.exists(job.output_path):
+                    job.cache_hits += 1
+                    self._remember(job)
+                    logger.info(f"Serving cached job {job.id} for '{search_term}'")
+                    return job
+                if job is not None:
+                    logger.info(f"Output of cached job {job.id} is gone, scraping '{search_term}' again")
+                    self.cache.invalidate(key)
+
+            job = Job(search_term, no_of_pages)
+            self._in_flight[key] = job
+            self._remember(job)
+        logger.info(f"Queued job {job.id} for '{search_term}' ({no_of_pages} pages)")
+        self._executor.submit(self._run, job, key, scrape_kwargs)
+        return job
+
+    def _remember(self, job):
+        self._jobs[job.id] = job
+        self._jobs.move_to_end(job.id)
+        self._prune()
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def _prune(self):
+        # Forget the oldest finished jobs once the history is full; running jobs are always kept
+        excess = len(self._jobs) - self.max_history
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished][:excess]:
+            del self._jobs[job_id]
+
+    def _run(self, job, key, scrape_kwargs):
+        # Everything logged for this scrape, page workers included, also lands in logs/jobs/<id>.log
+        with job_context(job.id):
+            self._scrape(job, key, scrape_kwargs)
+
+    def _scrape(self, job, key, scrape_kwargs):
+        job.status = RUNNING
+        job.started_at = time.time()
+        logger.info(f"Running job {job.id} for '{job.search_term}'")
+        try:
+            df = self.scrape_func(job.search_term, no_of_pages=job.no_of_pages, on_page=job.on_page,
+                                  raise_errors=True, timings=job.timings, **scrape_kwargs)
+            job.run_id = df.attrs.get('run_id')
+            job.output_path = df.attrs.get('output_path')
+            job.rows_written = df.attrs.get('rows_written', job.rows_written)
+            job.status = DONE
+            logger.info(f"Job {job.id} finished: {job.rows_written} products in {job.output_path}")
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+            logger.error(f"Job {job.id} failed: {str(e)}")
+            logger.debug(traceback.format_exc())
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._in_flight.pop(key, None)
+                if job.status == DONE and job.rows_written:
+                    self.cache.put(key, job)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
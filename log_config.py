@@ -0,0 +1,154 @@
+import atexit
+import contextvars
+import logging
+import os
+import queue
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_DIR = 'logs'
+JOB_LOG_DIR = os.path.join(LOG_DIR, 'jobs')
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 3
+MAX_OPEN_JOB_LOGS = 16
+
+# Id of the job the current code runs for; page workers inherit it through copy_context()
+current_job = contextvars.ContextVar('current_job', default=None)
+
+_listener = None
+_configure_lock = threading.Lock()
+
+class _DeferredQueueHandler(QueueHandler):
+    """Enqueue records unformatted so message formatting happens on the listener thread"""
+
+    def prepare(self, record):
+        record.job_id = current_job.get()
+        return record
+
+class JobFileHandler(logging.Handler):
+    """Write records tagged with a job id to logs/jobs/<job id>.log, keeping a few files open"""
+
+    def __init__(self, directory=JOB_LOG_DIR, max_bytes=DEFAULT_MAX_BYTES, backup_count=DEFAULT_BACKUP_COUNT):
+        super().__init__()
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._handlers = OrderedDict()
+
+    def _handler_for(self, job_id):
+        handler = self._handlers.get(job_id)
+        if handler is None:
+            os.makedirs(self.directory, exist_ok=True)
+            handler = RotatingFileHandler(job_log_path(job_id, self.directory), maxBytes=self.max_bytes,
+                                          backupCount=self.backup_count, encoding='utf-8', delay=True)
+            handler.setFormatter(self.formatter)
+            self._handlers[job_id] = handler
+            if len(self._handlers) > MAX_OPEN_JOB_LOGS:
+                _, oldest = self._handlers.popitem(last=False)
+                oldest.close()
+        else:
+            self._handlers.move_to_end(job_id)
+        return handler
+
+    def emit(self, record):
+        job_id = getattr(record, 'job_id', None)
+        if job_id is None:
+            return
+        self._handler_for(job_id).handle(record)
+
+    def release_job(self, job_id):
+        self.acquire()
+        try:
+            handler = self._handlers.pop(job_id, None)
+        finally:
+            self.release()
+        if handler is not None:
+            handler.close()
+
+    def close(self):
+        for handler in self._handlers.values():
+            handler.close()
+        self._handlers.clear()
+        super().close()
+
+def job_log_path(job_id, directory=JOB_LOG_DIR):
+    return os.path.join(directory, f"{job_id}.log")
+
+def configure_logging(log_name):
+    """Send all logging through a queue to a listener thread that owns the file and console handlers.
+
+    logs/<log_name> is appended to and rotated by size (MYNTRA_LOG_MAX_BYTES, MYNTRA_LOG_BACKUPS);
+    records logged inside a job_context also go to that job's own file. Only the first call in a
+    process configures anything, so whichever entry point is imported first decides the file name.
+    Returns the main log path.
+    """
+    global _listener
+    log_path = os.path.join(LOG_DIR, log_name)
+    with _configure_lock:
+        if _listener is not None:
+            return _listener.log_path
+        os.makedirs(LOG_DIR, exist_ok=True)
+        max_bytes = int(os.environ.get('MYNTRA_LOG_MAX_BYTES', DEFAULT_MAX_BYTES))
+        backup_count = int(os.environ.get('MYNTRA_LOG_BACKUPS', DEFAULT_BACKUP_COUNT))
+        formatter = logging.Formatter(LOG_FORMAT)
+
+        file_handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(os.environ.get('MYNTRA_CONSOLE_LOG_LEVEL', 'INFO').upper())
+        job_handler = JobFileHandler(max_bytes=max_bytes, backup_count=backup_count)
+        for handler in (file_handler, console_handler, job_handler):
+            handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        root = logging.getLogger()
+        root.setLevel(os.environ.get('MYNTRA_LOG_LEVEL', 'DEBUG').upper())
+        root.addHandler(_DeferredQueueHandler(log_queue))
+
+        _listener = QueueListener(log_queue, file_handler, console_handler, job_handler, respect_handler_level=True)
+        _listener.log_path = log_path
+        _listener.job_handler = job_handler
+        _listener.start()
+        atexit.register(stop_logging)
+    return log_path
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    with _configure_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+@contextmanager
+def job_context(job_id):
+    """Tag every record logged in this context (and in page workers started from it) with job_id"""
+    token = current_job.set(job_id)
+    try:
+        yield
+    finally:
+        current_job.reset(token)
+        if _listener is not None:
+            # Queued records for the job reopen the file in append mode, so closing early is safe
+            _listener.job_handler.release_job(job_id)
+
+def tail_lines(path, lines=50, block_size=8192):
+    """Last lines of a text file, read backwards from the end in blocks instead of the whole file"""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            data = b''
+            while position > 0 and data.count(b'\n') <= lines:
+                read_size = min(block_size, position)
+                position -= read_size
+                f.seek(position)
+                data = f.read(read_size) + data
+    except OSError:
+        return []
+    return [line.decode('utf-8', errors='replace') for line in data.splitlines()[-lines:]]
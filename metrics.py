@@ -0,0 +1,177 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# Stages a page goes through; spans for other names are recorded too, these just fix the display order
+STAGES = ('rate_limit', 'browser_lease', 'navigate', 'ready_wait', 'fetch', 'parse', 'extract', 'enrich', 'write',
+          'analytics', 'store')
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PRODUCT_BUCKETS = (0, 10, 25, 40, 50, 75, 100)
+
+def _label_text(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return '{' + pairs + '}'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _number(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """Monotonic counter, optionally split by labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, '') for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(labels.get(name, '') for name in self.labels), 0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, _label_text(self.labels, key), value) for key, value in sorted(self._values.items())]
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout (_bucket, _sum, _count)"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, buckets=SECONDS_BUCKETS, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets) + (math.inf,)
+        self.labels = tuple(labels)
+        # label values -> [per-bucket counts, sum, count]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, '') for name in self.labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    samples.append((self.name + '_bucket', _label_text(self.labels + ('le',), key + (_number(bound),)),
+                                    cumulative))
+                samples.append((self.name + '_sum', _label_text(self.labels, key), total))
+                samples.append((self.name + '_count', _label_text(self.labels, key), count))
+        return samples
+
+stage_seconds = Histogram('myntra_stage_seconds', "Time spent in each scrape stage", labels=('stage',))
+stage_errors = Counter('myntra_stage_errors_total', "Exceptions raised inside a scrape stage", labels=('stage',))
+pages_scraped = Counter('myntra_pages_scraped_total', "Result pages scraped and written")
+products_scraped = Counter('myntra_products_scraped_total', "Products written to scrape outputs")
+page_products = Histogram('myntra_page_products', "Products found per result page", buckets=PRODUCT_BUCKETS)
+scrapes = Counter('myntra_scrapes_total', "Finished scrape runs by outcome", labels=('status',))
+driver_starts = Histogram('myntra_driver_start_seconds', "Time to launch a browser for the pool")
+enrichments = Counter('myntra_enrichments_total', "Products enriched from their detail page, by source",
+                      labels=('result',))
+
+REGISTRY = [stage_seconds, stage_errors, pages_scraped, products_scraped, page_products, scrapes, driver_starts,
+            enrichments]
+
+class RunTimings:
+    """Per-run totals of every span, for the timing breakdown of a single scrape job"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # stage -> [count, total seconds, max seconds]
+        self._stages = {}
+        self.errors = {}
+        self.started = time.time()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            state = self._stages.get(stage)
+            if state is None:
+                state = self._stages[stage] = [0, 0.0, 0.0]
+            state[0] += 1
+            state[1] += seconds
+            state[2] = max(state[2], seconds)
+
+    def record_error(self, stage):
+        with self._lock:
+            self.errors[stage] = self.errors.get(stage, 0) + 1
+
+    def to_dict(self):
+        with self._lock:
+            order = [stage for stage in STAGES if stage in self._stages]
+            order += sorted(stage for stage in self._stages if stage not in STAGES)
+            stages = {}
+            for stage in order:
+                count, total, longest = self._stages[stage]
+                stages[stage] = {
+                    'count': count,
+                    'total_seconds': round(total, 4),
+                    'avg_ms': round(total * 1000 / count, 2),
+                    'max_ms': round(longest * 1000, 2),
+                }
+            return {'stages': stages, 'errors': dict(self.errors)}
+
+def observe(stage, seconds, timings=None):
+    stage_seconds.observe(seconds, stage=stage)
+    if timings is not None:
+        timings.record(stage, seconds)
+
+@contextmanager
+def span(stage, timings=None):
+    """Time a block into the process-wide stage histogram and, when given, a run's RunTimings"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        stage_errors.inc(stage=stage)
+        if timings is not None:
+            timings.record_error(stage)
+        raise
+    finally:
+        observe(stage, time.perf_counter() - start, timings)
+
+def gauge_lines(name, help_text, samples):
+    """Exposition lines for a gauge computed at scrape time; samples are (labels dict, value) pairs"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    for labels, value in samples:
+        lines.append(f"{name}{_label_text(tuple(labels), tuple(labels.values()))} {_number(value)}")
+    return lines
+
+def render(extra_lines=()):
+    """The Prometheus text exposition of every registered metric"""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help_text}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{labels} {_number(value)}")
+    lines.extend(extra_lines)
+    return '\n'.join(lines) + '\n'
@@ -1,192 +1,544 @@
 import pandas as pd
-from bs4 import BeautifulSoup
-import requests
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 import time
 import logging
 import traceback
 import os
+import threading
+import argparse
+import contextvars
+import functools
+import math
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from analytics import RunAnalytics, read_data_file, stats_path
+import batch
+from browser_pool import BrowserPool, close_shared_pool, get_shared_pool
+from enrichment import ProductEnricher
+from http_backend import HttpFetcher
+from log_config import configure_logging
+import metrics
+from extractors import ProductExtractor, extract_total_count, get_extractor
+from product_records import ProductTableBuilder
+from product_store import get_default_store, parse_product_id
+from run_catalog import COMPLETE, INTERRUPTED, get_default_catalog, term_slug
+from sinks import FORMAT_EXTENSIONS, open_sink
 
 # Ensure required directories exist
-os.makedirs('logs', exist_ok=True)
 os.makedirs('csv_data', exist_ok=True)
 
-# Configure logging - use fixed filenames and overwrite
-log_path = os.path.join('logs', 'scraper.log')
-
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_path, mode='w'),  # Use 'w' mode to overwrite
-        logging.StreamHandler()
-    ]
-)
+# Logging goes through a background queue into logs/scraper.log (appended and rotated), unless
+# the web UI configured it first
+log_path = configure_logging('scraper.log')
 logger = logging.getLogger(__name__)
 logger.info(f"Logging to: {log_path}")
 
-def search_url(search_term, page_number):
-    template = 'https://www.myntra.com/{}?p={}'
+# Scraping defaults - the worker count and politeness interval can be overridden with env vars
+MYNTRA_BASE_URL = os.environ.get('MYNTRA_BASE_URL', 'https://www.myntra.com')
+DEFAULT_WORKERS = 4
+DEFAULT_MIN_REQUEST_INTERVAL = 1.0  # Minimum seconds between any two page loads across all workers
+DEFAULT_PAGE_TIMEOUT = 15.0  # Maximum seconds to wait for a page to become ready
+# 'selenium' renders every page in Chrome; 'http' fetches server-rendered pages and only falls back to Chrome
+DEFAULT_BACKEND = 'selenium'
+BACKENDS = ('selenium', 'http')
+DEFAULT_OUTPUT_FORMAT = 'csv'  # csv, ndjson or parquet
+DEFAULT_PAGES = 10
+MAX_PAGES = 200  # Page cap when only a max_products budget is given
+
+_output_lock = threading.Lock()
+
+# Single round trip per poll: document state, number of network resources fetched so far, product count
+READINESS_SCRIPT = (
+    "return [document.readyState, "
+    "performance.getEntriesByType('resource').length, "
+    "document.querySelectorAll('li.product-base').length];"
+)
+
+def search_url(search_term, page_number, base_url=None):
+    template = (base_url or MYNTRA_BASE_URL).rstrip('/') + '/{}?p={}'
     url = template.format(search_term, page_number)
-    logger.debug(f"Generated URL: {url}")
+    logger.debug("Generated URL: %s", url)
     return url
 
-def scrape_myntra():
+class RateLimiter:
+    """Global politeness limit shared by all workers: at most one navigation every min_interval seconds"""
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+def wait_for_page_ready(driver, timeout=DEFAULT_PAGE_TIMEOUT, poll_interval=0.2, stable_polls=2, empty_grace=1.5,
+                        ready_states=('complete',)):
+    """Wait until product nodes are present, their count is stable and the network is idle.
+
+    Returns (ready, seconds_to_ready, product_count). A page that settles with no products
+    is considered ready once it has stayed empty and idle for empty_grace seconds.
+    """
+    start = time.monotonic()
+    last_state = None
+    stable = 0
+    while True:
+        elapsed = time.monotonic() - start
+        try:
+            ready_state, resources, count = driver.execute_script(READINESS_SCRIPT)
+        except Exception as e:
+            logger.debug("Readiness probe failed: %s", e)
+            ready_state, resources, count = None, None, 0
+
+        state = (resources, count)
+        if ready_state in ready_states and state == last_state:
+            stable += 1
+        else:
+            stable = 0
+        last_state = state
+
+        # Network idle (no new resources) and product count unchanged for stable_polls consecutive polls
+        if stable >= stable_polls and (count > 0 or elapsed >= empty_grace):
+            return True, elapsed, count
+        if elapsed >= timeout:
+            logger.warning(f"Page not ready after {timeout}s (products so far: {count})")
+            return False, elapsed, count
+        time.sleep(poll_interval)
+
+def parse_products(page_source, extractor=None, timings=None):
+    """Extract the product records from one rendered listing page"""
+    if not isinstance(extractor, ProductExtractor):
+        extractor = get_extractor(extractor)
+    logger.debug("Parsing page with '%s' extractor", extractor.name)
+    with metrics.span('parse', timings):
+        products = extractor.products(page_source)
+    with metrics.span('extract', timings):
+        return extractor.records(products)
+
+def render_page(pool, url, page_no, page_timeout=DEFAULT_PAGE_TIMEOUT, page_timings=None, timings=None):
+    """Load url on a leased browser worker and return the rendered page source"""
+    lease_start = time.perf_counter()
+    with pool.lease() as driver:
+        # Includes launching a browser when the pool has none idle
+        metrics.observe('browser_lease', time.perf_counter() - lease_start, timings)
+        logger.debug("Navigating to URL: %s", url)
+        with metrics.span('navigate', timings):
+            driver.get(url)
+        logger.debug("Waiting for page to become ready")
+        # Eager browsers (the lean profile) never wait for subresources, so the DOM being parsed is enough
+        eager = getattr(driver, 'capabilities', {}).get('pageLoadStrategy') == 'eager'
+        ready_states = ('interactive', 'complete') if eager else ('complete',)
+        with metrics.span('ready_wait', timings):
+            ready, seconds, count = wait_for_page_ready(driver, timeout=page_timeout, ready_states=ready_states)
+        logger.debug("Page %d ready=%s after %.2fs with %d products", page_no, ready, seconds, count)
+        if page_timings is not None:
+            page_timings[page_no] = seconds
+        return driver.page_source
+
+def scrape_page(pool, rate_limiter, search_term, page_no, no_of_pages, base_url,
+                page_timeout=DEFAULT_PAGE_TIMEOUT, page_timings=None, http_fetcher=None, want_total=False,
+                timings=None):
+    """Fetch and parse a single result page, over HTTP when a fetcher is given and in Chrome otherwise.
+
+    Returns (records, total_count); total_count is only read when want_total is set and the page shows one.
+    """
+    logger.info("Scraping page %d of %d", page_no, no_of_pages)
+    url = search_url(search_term, page_no, base_url)
+    with metrics.span('rate_limit', timings):
+        rate_limiter.wait()
+
+    records = None
+    if http_fetcher is not None:
+        records, page_source = http_fetcher.fetch_page(
+            url, fallback_parser=functools.partial(parse_products, timings=timings), timings=timings
+        )
+        if records is None:
+            logger.info("Falling back to Selenium for page %d", page_no)
+            with metrics.span('rate_limit', timings):
+                rate_limiter.wait()
+
+    if records is None:
+        page_source = render_page(pool, url, page_no, page_timeout, page_timings, timings)
+        records = parse_products(page_source, timings=timings)
+
+    total_count = extract_total_count(page_source) if want_total else None
+    logger.info("Found %d products on page %d", len(records), page_no)
+    return records, total_count
+
+def product_key(record):
+    """Identity used to spot pages that only repeat products already seen in this run"""
+    return parse_product_id(record.product_url) or record.product_url
+
+def resume_analytics(output_path, sink):
+    """Pick up the analytics of an interrupted run, rebuilding them if the sidecar is behind the data"""
+    try:
+        analytics = RunAnalytics.load(stats_path(output_path))
+        if analytics.last_page == sink.last_completed_page:
+            return analytics
+    except (OSError, ValueError):
+        pass
+    logger.info(f"Rebuilding analytics for {output_path} from the data written so far")
+    analytics = RunAnalytics.from_frame(read_data_file(output_path))
+    analytics.pages = len(sink.completed_pages)
+    analytics.last_page = sink.last_completed_page
+    return analytics
+
+def scrape_myntra(search_term=None, no_of_pages=None, workers=None, min_interval=None,
+                  base_url=None, driver_factory=None, page_timeout=None, backend=None,
+                  output_format=None, resume=False, collect=True, on_page=None, raise_errors=False,
+                  browser_pool=None, catalog=None, product_store=None, max_products=None, adaptive=None,
+                  timings=None, executor=None, rate_limiter=None, http_fetcher=None, enricher=None):
     logger.info("Starting Myntra scraper")
-    # Setup Chrome with WebDriver Manager
-    logger.info("Setting up Chrome WebDriver")
-    options = webdriver.ChromeOptions()
-    # Uncomment the next line if you want to run Chrome in headless mode
-    # options.add_argument('--headless')
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
+    if workers is None:
+        workers = int(os.environ.get('MYNTRA_WORKERS', DEFAULT_WORKERS))
+    if min_interval is None:
+        min_interval = float(os.environ.get('MYNTRA_MIN_REQUEST_INTERVAL', DEFAULT_MIN_REQUEST_INTERVAL))
+    if page_timeout is None:
+        page_timeout = float(os.environ.get('MYNTRA_PAGE_TIMEOUT', DEFAULT_PAGE_TIMEOUT))
+    if backend is None:
+        backend = os.environ.get('MYNTRA_BACKEND', DEFAULT_BACKEND)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+    if output_format is None:
+        output_format = os.environ.get('MYNTRA_OUTPUT_FORMAT', DEFAULT_OUTPUT_FORMAT)
+    if output_format not in FORMAT_EXTENSIONS:
+        raise ValueError(f"Unknown output format '{output_format}', expected one of {tuple(FORMAT_EXTENSIONS)}")
+    if max_products is None and os.environ.get('MYNTRA_MAX_PRODUCTS'):
+        max_products = int(os.environ['MYNTRA_MAX_PRODUCTS'])
+    if no_of_pages is None:
+        no_of_pages = DEFAULT_PAGES if max_products is None else MAX_PAGES
+    # Adaptive pagination stops at the end of the results instead of loading every requested page
+    if adaptive is None:
+        adaptive = os.environ.get('MYNTRA_ADAPTIVE_PAGINATION', '1') != '0'
+    workers = max(1, min(workers, no_of_pages))
+
+    # Lease browsers from the shared warm pool unless the caller brings its own driver factory or pool.
+    # Browsers are only launched when a page actually needs one.
+    logger.info(f"Using '{backend}' backend with {workers} worker(s)")
+    owns_pool = browser_pool is None and driver_factory is not None
+    if browser_pool is not None:
+        pool = browser_pool
+    elif owns_pool:
+        pool = BrowserPool(size=workers, driver_factory=driver_factory)
+    else:
+        pool = get_shared_pool()
+    # A batch shares one page executor, rate limiter and HTTP fetcher between its terms; workers then
+    # only caps how many of this term's pages are in flight at once
+    owns_fetcher = http_fetcher is None and backend == 'http'
+    if owns_fetcher:
+        http_fetcher = HttpFetcher(pool_size=workers)
+    elif backend != 'http':
+        http_fetcher = None
+    # Per-stage timing totals for this run (the caller may pass its own to watch them live)
+    if timings is None:
+        timings = metrics.RunTimings()
+    if rate_limiter is None:
+        rate_limiter = RateLimiter(min_interval)
     
+    sink = None
+    owns_enricher = False
     try:
-        search_term = input('Enter your search term: ')
-        logger.info(f"User entered search term: '{search_term}'")
+        if search_term is None:
+            search_term = input('Enter your search term: ')
+            logger.info(f"User entered search term: '{search_term}'")
         
-        brands = []
-        prices = []
-        orig_prices = []
-        desc = []
-        sizes = []
-        links = []
+        # Open the output up front - every page is appended and flushed as soon as it is scraped.
+        # The run catalog hands out the output name and records the run, so nothing probes the directory.
+        if catalog is None:
+            catalog = get_default_catalog()
+        # Every page is also upserted into the deduplicated product store (MYNTRA_PRODUCT_STORE=0 turns it off)
+        if product_store is None and os.environ.get('MYNTRA_PRODUCT_STORE', '1') != '0':
+            product_store = get_default_store()
+        # Product pages are only fetched when asked for (MYNTRA_ENRICH=1 or enricher=True); a batch passes a shared one
+        if enricher is None:
+            enricher = os.environ.get('MYNTRA_ENRICH', '0') == '1'
+        if enricher is True:
+            enricher = ProductEnricher(store=product_store or None, base_url=base_url or MYNTRA_BASE_URL,
+                                       rate_limiter=rate_limiter)
+            owns_enricher = True
+        enrichment = {'fetched': 0, 'cached': 0, 'failed': 0}
+        base_name = f"myntra_products_{term_slug(search_term)}"
+        # Two runs must not resume the same unfinished output: the catalog only hands out runs whose
+        # owning process is gone, and claims them for this one
+        with _output_lock:
+            run = catalog.claim_resumable(search_term, output_format) if resume else None
+            if run is not None:
+                run_id, output_path = run['id'], run['output_path']
+            else:
+                output_path = catalog.allocate_output('csv_data', base_name, FORMAT_EXTENSIONS[output_format])
+                run_id = catalog.start_run(search_term, output_path, output_format, no_of_pages)
+            logger.info(f"Writing {output_format} output to: {output_path} (run {run_id})")
+            sink = open_sink(output_path, output_format, resume=run is not None,
+                             metadata={'search_term': search_term, 'no_of_pages': no_of_pages, 'run_id': run_id})
+        first_page = sink.last_completed_page + 1
         
-        no_of_pages = 10  # Scrape 10 pages (about 500 products)
-        logger.info(f"Will scrape {no_of_pages} pages")
+        # Analytics are accumulated page by page into a sidecar so the results view never re-reads the data
+        analytics_path = stats_path(output_path)
+        analytics = resume_analytics(output_path, sink) if sink.completed_pages else RunAnalytics()
         
-        for page_no in range(1, no_of_pages + 1):
-            logger.info(f"Scraping page {page_no} of {no_of_pages}")
-            url = search_url(search_term, page_no)
-            logger.debug(f"Navigating to URL: {url}")
-            
-            driver.get(url)
-            logger.debug("Waiting for page to load")
-            time.sleep(3)  # Wait for dynamic content to load
-            
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            logger.debug("Parsing page with BeautifulSoup")
-            
-            # Find all product items
-            products = soup.find_all('li', class_='product-base')
-            logger.info(f"Found {len(products)} products on page {page_no}")
-            
-            for product in products:
-                try:
-                    # Extract brand
-                    brand_elem = product.find('h3', class_='product-brand')
-                    brand = brand_elem.text.strip() if brand_elem else "N/A"
-                    brands.append(brand)
-                    
-                    # Extract price
-                    price_elem = product.find('span', class_='product-discountedPrice')
-                    if not price_elem:
-                        price_elem = product.find('div', class_='product-price')
-                    price = price_elem.text.strip() if price_elem else "N/A"
-                    # Remove 'Rs. ' from the price
-                    price = price.replace('Rs. ', '') if price != "N/A" else price
-                    prices.append(price)
-                    
-                    # Extract original price
-                    orig_price_elem = product.find('span', class_='product-strike')
-                    orig_price = orig_price_elem.text.strip() if orig_price_elem else "N/A"
-                    # Remove 'Rs. ' from the original price
-                    orig_price = orig_price.replace('Rs. ', '') if orig_price != "N/A" else orig_price
-                    orig_prices.append(orig_price)
-                    
-                    # Extract product description
-                    desc_elem = product.find('h4', class_='product-product')
-                    description = desc_elem.text.strip() if desc_elem else "N/A"
-                    desc.append(description)
-                    
-                    # Extract sizes
-                    sizes_elem = product.find('h4', class_='product-sizes')
-                    size = sizes_elem.text.strip() if sizes_elem else "N/A"
-                    sizes.append(size)
-                    
-                    # Extract product link
-                    link_elem = product.find('a')
-                    link = "https://www.myntra.com" + link_elem['href'] if link_elem and 'href' in link_elem.attrs else "N/A"
-                    links.append(link)
-                    
-                except Exception as e:
-                    logger.error(f"Error extracting data from product: {str(e)}")
-                    # Append N/A for any missing data
-                    if len(brands) < len(prices):
-                        brands.append("N/A")
-                    if len(prices) < len(brands):
-                        prices.append("N/A")
-                    if len(orig_prices) < len(brands):
-                        orig_prices.append("N/A")
-                    if len(desc) < len(brands):
-                        desc.append("N/A")
-                    if len(sizes) < len(brands):
-                        sizes.append("N/A")
-                    if len(links) < len(brands):
-                        links.append("N/A")
-            
-            logger.info(f"Completed scraping page {page_no}")
+        # Only the returned DataFrame grows with the page count; pass collect=False to keep memory bounded
+        table = ProductTableBuilder() if collect else None
         
-        # Close the webdriver
-        logger.info("Closing WebDriver")
-        driver.quit()
+        page_timings = {}
+        logger.info(f"Will scrape pages {first_page} to {no_of_pages}" + (" or until the results run out" if adaptive else ""))
         
-        # Create DataFrame
-        logger.info("Creating DataFrame with scraped data")
-        df = pd.DataFrame({
-            'brand_name': brands,
-            'price': prices,
-            'original_price': orig_prices,
-            'description': desc,
-            'sizes': sizes,
-            'product_url': links
-        })
+        last_page = no_of_pages
+        seen_products = set()
+        if adaptive:
+            # Only page 1 reports the result count, so a resumed run takes its page cap (and the products of
+            # its last written page, to spot a repeat) from the checkpoint
+            last_page = min(last_page, sink.metadata.get('result_pages', last_page))
+            seen_products.update(sink.metadata.get('last_page_keys', ()))
+        stop_reason = None
+        accepted = sink.rows_written
+        if executor is None:
+            executor_context = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='page-worker')
+        else:
+            executor_context = nullcontext(executor)
+        # Product pages are fetched on their own threads, so the next listing pages load meanwhile
+        if enricher:
+            enrich_context = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='page-enrich')
+        else:
+            enrich_context = nullcontext()
+        with executor_context as executor, enrich_context as enrich_executor:
+            def submit(page_no):
+                # Page workers run in a copy of this context, so their log records keep the job id
+                return executor.submit(contextvars.copy_context().run, scrape_page, pool, rate_limiter, search_term,
+                                       page_no, no_of_pages, base_url, page_timeout, page_timings, http_fetcher,
+                                       adaptive and page_no == 1, timings)
+
+            def enrich(records):
+                with metrics.span('enrich', timings):
+                    return enricher.enrich(records)
+
+            # Keep at most one page per worker in flight, so stopping early wastes few page loads.
+            # Page 1 goes alone: its result count can shrink the crawl before anything else is fetched.
+            next_page = first_page
+            pending = deque()
+            # Pages accepted for the output, waiting for their product pages: (page_no, records, keys, enriching)
+            ready = deque()
+
+            def top_up(window):
+                nonlocal next_page
+                while not stop_reason and next_page <= last_page and len(pending) < window:
+                    pending.append((next_page, submit(next_page)))
+                    next_page += 1
+
+            def stop(reason):
+                nonlocal stop_reason
+                stop_reason = reason
+                for _, future in pending:
+                    future.cancel()
+                pending.clear()
+
+            def accept(page_no, records, total_count):
+                nonlocal last_page, accepted
+                keys = None
+                if adaptive:
+                    if not records:
+                        stop(f"page {page_no} is empty")
+                        return
+                    keys = {product_key(record) for record in records}
+                    if keys <= seen_products:
+                        stop(f"page {page_no} only repeats products already scraped")
+                        return
+                    seen_products.update(keys)
+                    if total_count is not None:
+                        result_pages = max(1, math.ceil(total_count / len(records)))
+                        logger.info(f"Search reports {total_count} results ({result_pages} pages)")
+                        last_page = min(last_page, result_pages)
+                        sink.metadata['result_pages'] = result_pages
+                if max_products is not None:
+                    records = records[:max(0, max_products - accepted)]
+                accepted += len(records)
+                enriching = enrich_executor.submit(contextvars.copy_context().run, enrich, records) if enricher else None
+                ready.append((page_no, records, keys, enriching))
+
+                if max_products is not None:
+                    remaining = max_products - accepted
+                    if remaining <= 0:
+                        stop(f"reached the budget of {max_products} products")
+                    elif records:
+                        last_page = min(last_page, page_no + math.ceil(remaining / len(records)))
+
+            def write(page_no, records, keys, enriching):
+                if enriching is not None:
+                    for name, count in enriching.result().items():
+                        enrichment[name] += count
+                if keys is not None:
+                    # Checkpointed with the page, so a resumed run can tell when the next page repeats it
+                    sink.metadata['last_page_keys'] = sorted(keys, key=str)
+                with metrics.span('write', timings):
+                    sink.write_page(page_no, records)
+                with metrics.span('analytics', timings):
+                    analytics.update(records, page_no)
+                    analytics.save(analytics_path)
+                catalog.update_progress(run_id, len(sink.completed_pages), sink.rows_written)
+                if product_store:
+                    with metrics.span('store', timings):
+                        product_store.upsert_page(records, run_id)
+                metrics.pages_scraped.inc()
+                metrics.products_scraped.inc(len(records))
+                metrics.page_products.observe(len(records))
+                if on_page is not None:
+                    on_page(page_no, len(records))
+                if table is not None:
+                    table.extend(records)
+
+            top_up(1 if adaptive and first_page == 1 else workers)
+            try:
+                while pending or ready:
+                    if pending:
+                        page_no, future = pending.popleft()
+                        accept(page_no, *future.result())
+                        top_up(workers)
+                    # Write pages in page order as their product pages come in; once the listings are done,
+                    # or a window's worth of pages is waiting, wait for the oldest
+                    while ready and (ready[0][3] is None or ready[0][3].done() or not pending or len(ready) > workers):
+                        write(*ready.popleft())
+            finally:
+                # Pages past the stopping point (or after an error) are never written
+                for _, future in pending:
+                    future.cancel()
+                for _, _, _, enriching in ready:
+                    if enriching is not None:
+                        enriching.cancel()
+        if stop_reason:
+            logger.info(f"Stopped after page {sink.last_completed_page}: {stop_reason}")
         
-        # Save to CSV
-        csv_name = f"myntra_products_{search_term.replace(' ', '_')}.csv"
-        csv_filename = get_unique_filename('csv_data', csv_name)
-        csv_path = os.path.join('csv_data', csv_filename)
+        sink.close()
+        catalog.finish_run(run_id, COMPLETE, sink.rows_written)
+        metrics.scrapes.inc(status=COMPLETE)
+        logger.info(f"Saved {sink.rows_written} products to {output_path}")
         
-        logger.info(f"Saving data to CSV: {csv_path}")
-        df.to_csv(csv_path, index=False)
-        logger.info(f"Saved {len(df)} products to {csv_path}")
+        # Close a private webdriver pool and the HTTP sessions - the shared pool stays warm for the next run
+        if owns_pool:
+            pool.close()
+        if owns_fetcher:
+            http_fetcher.close()
+        if owns_enricher:
+            enricher.close()
+        
+        if page_timings:
+            avg_ready = sum(page_timings.values()) / len(page_timings)
+            logger.info(f"Average time-to-ready: {avg_ready:.2f}s over {len(page_timings)} pages")
+        
+        # Create DataFrame
+        if table is not None:
+            logger.info("Creating DataFrame with scraped data")
+            df = table.build()
+        else:
+            df = ProductTableBuilder().build()
+        df.attrs['run_id'] = run_id
+        df.attrs['output_path'] = output_path
+        df.attrs['analytics_path'] = analytics_path
+        df.attrs['rows_written'] = sink.rows_written
+        df.attrs['pages_scraped'] = len(sink.completed_pages)
+        df.attrs['stop_reason'] = stop_reason
+        df.attrs['enrichment'] = enrichment if enricher else None
+        df.attrs['timings'] = timings.to_dict()
+        df.attrs['page_ready_seconds'] = [page_timings[p] for p in sorted(page_timings)]
         
         return df
         
-    except Exception as e:
+    except BaseException as e:
+        metrics.scrapes.inc(status=INTERRUPTED if sink is not None else 'failed')
         logger.critical(f"Critical error in scraper: {str(e)}")
         logger.critical(traceback.format_exc())
         
-        # Make sure to close the driver in case of error
+        # Keep the checkpoint so the run can be resumed from the last completed page
+        if sink is not None:
+            try:
+                sink.close(complete=False)
+                catalog.finish_run(run_id, INTERRUPTED, sink.rows_written)
+                logger.info(f"Progress saved after page {sink.last_completed_page}; rerun with resume=True to continue")
+            except Exception:
+                pass
+        
+        # Make sure to close the drivers in case of error
         try:
-            if driver:
-                driver.quit()
+            if owns_pool:
+                pool.close()
+            if owns_fetcher:
+                http_fetcher.close()
+            if owns_enricher:
+                enricher.close()
         except:
             pass
         
+        if raise_errors or isinstance(e, KeyboardInterrupt):
+            raise
+        
         # Return empty DataFrame in case of error
         return pd.DataFrame()
 
-# Function to generate a unique filename if a file already exists
-def get_unique_filename(folder, filename):
-    """Generate a unique filename by adding a number suffix if the file already exists"""
-    base_name, extension = os.path.splitext(filename)
-    counter = 1
-    new_filename = filename
-    
-    while os.path.exists(os.path.join(folder, new_filename)):
-        new_filename = f"{base_name}_{counter}{extension}"
-        counter += 1
-        
-    return new_filename
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape Myntra search results")
+    parser.add_argument('search_term', nargs='?', help="Search term (prompted for when omitted)")
+    parser.add_argument('--pages', type=int, help=f"Maximum number of result pages to scrape (default {DEFAULT_PAGES})")
+    parser.add_argument('--max-products', type=int, help="Stop once this many products have been scraped")
+    parser.add_argument('--format', dest='output_format', choices=tuple(FORMAT_EXTENSIONS), help="Output format")
+    parser.add_argument('--resume', action='store_true', help="Continue the last interrupted run for this term")
+    parser.add_argument('--enrich', action='store_true', default=None,
+                        help="Fetch every product's page for sizes, rating and seller (or set MYNTRA_ENRICH=1)")
+    parser.add_argument('--batch', metavar='FILE', help="Scrape every term in FILE (one per line, '-' for stdin)")
+    parser.add_argument('--checkpoint', help="Batch checkpoint file (default derived from the term list)")
+    parser.add_argument('--workers', type=int, help=f"Page workers (shared by all terms of a batch, default {DEFAULT_WORKERS})")
+    parser.add_argument('--term-workers', type=int, help="Terms of a batch scraped at the same time (default: --workers)")
+    parser.add_argument('--retries', type=int, default=batch.DEFAULT_RETRIES, help="Retries per failed batch term")
+    parser.add_argument('--backoff', type=float, default=batch.DEFAULT_BACKOFF,
+                        help="Seconds before a term's first retry, doubled for each further one")
+    args = parser.parse_args(argv)
+    if args.batch and args.search_term:
+        parser.error("give either a search term or --batch, not both")
+    return args
+
+def run_batch(args):
+    """Scrape all terms of a --batch file on one shared worker pool and rate limiter"""
+    terms = batch.read_terms(args.batch)
+    workers = args.workers or int(os.environ.get('MYNTRA_WORKERS', DEFAULT_WORKERS))
+    rate_limiter = RateLimiter(float(os.environ.get('MYNTRA_MIN_REQUEST_INTERVAL', DEFAULT_MIN_REQUEST_INTERVAL)))
+    # One enricher for the whole batch, so its concurrency bound and the rate limit hold across terms
+    enricher = None
+    if args.enrich or os.environ.get('MYNTRA_ENRICH', '0') == '1':
+        store = get_default_store() if os.environ.get('MYNTRA_PRODUCT_STORE', '1') != '0' else None
+        enricher = ProductEnricher(store=store, base_url=MYNTRA_BASE_URL, rate_limiter=rate_limiter)
+    try:
+        states = batch.run_batch(terms, scrape_myntra, checkpoint_path=args.checkpoint, workers=workers,
+                                 term_workers=args.term_workers, retries=args.retries, backoff=args.backoff,
+                                 rate_limiter=rate_limiter, no_of_pages=args.pages,
+                                 output_format=args.output_format, max_products=args.max_products,
+                                 enricher=enricher or False)
+    finally:
+        if enricher is not None:
+            enricher.close()
+    failed = [state['term'] for state in states.values() if state.get('status') == batch.FAILED]
+    if failed:
+        logger.error(f"{len(failed)} term(s) failed: {', '.join(failed)}")
+    return not failed
 
 if __name__ == "__main__":
     logger.info("Running scraper from main")
+    args = parse_args()
+    ok = True
     try:
-        df = scrape_myntra()
-        logger.info(f"Scraper completed successfully. Scraped {len(df)} products.")
+        if args.batch:
+            ok = run_batch(args)
+        else:
+            df = scrape_myntra(args.search_term, no_of_pages=args.pages, workers=args.workers,
+                               output_format=args.output_format, resume=args.resume, collect=False,
+                               max_products=args.max_products, enricher=args.enrich)
+            logger.info(f"Scraper completed successfully. Scraped {df.attrs.get('rows_written', 0)} products.")
     except Exception as e:
+        ok = False
         logger.critical(f"Fatal error in main: {str(e)}")
-        logger.critical(traceback.format_exc()) 
\ No newline at end of file
+        logger.critical(traceback.format_exc())
+    finally:
+        close_shared_pool()
+    if not ok:
+        raise SystemExit(1)
@@ -0,0 +1,90 @@
+import re
+from dataclasses import dataclass
+
+import pandas as pd
+
+# Output column order (also the CSV header); rating, rating_count and seller are only filled by enrichment
+COLUMNS = ('brand_name', 'price', 'original_price', 'discount_percent', 'description', 'sizes', 'product_url',
+           'rating', 'rating_count', 'seller')
+
+# Column dtypes of the DataFrame built from records - nullable integers so missing prices never force object dtype
+DTYPES = {
+    'brand_name': 'category',
+    'price': 'Int32',
+    'original_price': 'Int32',
+    'discount_percent': 'Int8',
+    'description': 'string',
+    'sizes': 'string',
+    'product_url': 'string',
+    'rating': 'Float64',
+    'rating_count': 'Int32',
+    'seller': 'string',
+}
+
+_NON_DIGITS = re.compile(r'[^\d]')
+
+def parse_price(value):
+    """Turn '1299', 'Rs. 1,299' or 1299 into an int; 'N/A', '' and None become None"""
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    digits = _NON_DIGITS.sub('', value)
+    return int(digits) if digits else None
+
+def discount_percent(price, original_price):
+    """Discount shown on the listing card, as a whole percentage (None when the product is not discounted)"""
+    if price is None or not original_price or original_price <= price:
+        return None
+    return round((original_price - price) * 100 / original_price)
+
+@dataclass
+class ProductRecord:
+    """One scraped product, with prices already parsed"""
+
+    __slots__ = ('brand_name', 'price', 'original_price', 'discount_percent', 'description', 'sizes', 'product_url',
+                 'rating', 'rating_count', 'seller')
+
+    brand_name: str
+    price: object
+    original_price: object
+    discount_percent: object
+    description: str
+    sizes: str
+    product_url: str
+    rating: object
+    rating_count: object
+    seller: object
+
+    @classmethod
+    def from_fields(cls, brand_name, price, original_price, description, sizes, product_url, rating=None,
+                    rating_count=None, seller=None):
+        """Build a record from the raw listing-card values (prices as text or int)"""
+        price = parse_price(price)
+        original_price = parse_price(original_price)
+        return cls(brand_name, price, original_price, discount_percent(price, original_price),
+                   description, sizes, product_url, rating, rating_count, seller)
+
+class ProductTableBuilder:
+    """Accumulates records column by column and builds a correctly typed DataFrame"""
+
+    def __init__(self):
+        self._columns = {name: [] for name in COLUMNS}
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def add(self, record):
+        for name in COLUMNS:
+            self._columns[name].append(getattr(record, name))
+        self._count += 1
+
+    def extend(self, records):
+        for record in records:
+            self.add(record)
+
+    def build(self):
+        return pd.DataFrame({
+            name: pd.Series(values, dtype=DTYPES[name]) for name, values in self._columns.items()
+        }, columns=list(COLUMNS))
@@ -0,0 +1,200 @@
+import logging
+import os
+import re
+import time
+
+from sqlite_store import SQLiteStore, add_missing_columns, lazy_default
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_PATH = os.environ.get('MYNTRA_PRODUCT_DB', os.path.join('csv_data', 'products.sqlite'))
+
+# Listing links end in .../<product id>/buy
+PRODUCT_ID_PATTERN = re.compile(r'/(\d+)/buy\b')
+TRAILING_ID_PATTERN = re.compile(r'/(\d+)/?(?:[?#].*)?$')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    product_id INTEGER PRIMARY KEY,
+    brand_name TEXT,
+    description TEXT,
+    sizes TEXT,
+    product_url TEXT,
+    price INTEGER,
+    original_price INTEGER,
+    discount_percent INTEGER,
+    previous_price INTEGER,
+    price_drop INTEGER,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    last_run_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_products_brand ON products (brand_name);
+CREATE INDEX IF NOT EXISTS idx_products_last_seen ON products (last_seen);
+CREATE INDEX IF NOT EXISTS idx_products_last_run ON products (last_run_id);
+
+CREATE TABLE IF NOT EXISTS price_history (
+    product_id INTEGER NOT NULL,
+    run_id INTEGER NOT NULL,
+    seen_at REAL NOT NULL,
+    price INTEGER,
+    original_price INTEGER,
+    PRIMARY KEY (product_id, run_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_price_history_seen ON price_history (seen_at);
+
+CREATE TABLE IF NOT EXISTS product_details (
+    product_id INTEGER PRIMARY KEY,
+    sizes TEXT,
+    rating REAL,
+    rating_count INTEGER,
+    seller TEXT,
+    enriched_at REAL NOT NULL
+);
+"""
+
+# Only products that got cheaper have a price_drop, so these indexes stay small and list them
+# biggest drop first, overall, per brand and per run. Created after _migrate adds the column to older stores.
+PRICE_DROP_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_products_price_drop ON products (price_drop) WHERE price_drop IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_products_brand_price_drop ON products (brand_name, price_drop)
+    WHERE price_drop IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_products_run_price_drop ON products (last_run_id, price_drop)
+    WHERE price_drop IS NOT NULL;
+"""
+
+# The price from the last *different* run; SET expressions all see the row as it was before the update
+_PREVIOUS_PRICE = """CASE WHEN products.last_run_id IS NOT excluded.last_run_id
+                          THEN products.price ELSE products.previous_price END"""
+
+# previous_price and price_drop are maintained here, so "dropped since last run" never has to sort the table
+UPSERT_PRODUCT = f"""
+INSERT INTO products (product_id, brand_name, description, sizes, product_url, price, original_price,
+                      discount_percent, previous_price, price_drop, first_seen, last_seen, last_run_id)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL, NULL, ?, ?, ?)
+ON CONFLICT (product_id) DO UPDATE SET
+    previous_price = {_PREVIOUS_PRICE},
+    price_drop = CASE WHEN excluded.price < {_PREVIOUS_PRICE}
+                      THEN {_PREVIOUS_PRICE} - excluded.price END,
+    brand_name = excluded.brand_name,
+    description = excluded.description,
+    sizes = excluded.sizes,
+    product_url = excluded.product_url,
+    price = excluded.price,
+    original_price = excluded.original_price,
+    discount_percent = excluded.discount_percent,
+    last_seen = excluded.last_seen,
+    last_run_id = excluded.last_run_id
+"""
+
+INSERT_HISTORY = """
+INSERT OR IGNORE INTO price_history (product_id, run_id, seen_at, price, original_price)
+VALUES (?, ?, ?, ?, ?)
+"""
+
+def parse_product_id(product_url):
+    """Myntra product id from a listing link, or None"""
+    if not product_url:
+        return None
+    match = PRODUCT_ID_PATTERN.search(product_url) or TRAILING_ID_PATTERN.search(product_url)
+    return int(match.group(1)) if match else None
+
+class ProductStore(SQLiteStore):
+    """Deduplicated product table keyed on the Myntra product id, with an append-only price history"""
+
+    schema = SCHEMA
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        super().__init__(path)
+
+    def _migrate(self, conn):
+        if add_missing_columns(conn, 'products', (('price_drop', 'INTEGER'),)):
+            conn.execute('UPDATE products SET price_drop = previous_price - price WHERE price < previous_price')
+        conn.executescript(PRICE_DROP_INDEXES)
+
+    def upsert_page(self, records, run_id, seen_at=None):
+        """Bulk upsert one scraped page in a single transaction; returns the number of stored products"""
+        seen_at = time.time() if seen_at is None else seen_at
+        products = []
+        history = []
+        for record in records:
+            product_id = parse_product_id(record.product_url)
+            if product_id is None:
+                continue
+            products.append((product_id, record.brand_name, record.description, record.sizes, record.product_url,
+                             record.price, record.original_price, record.discount_percent,
+                             seen_at, seen_at, run_id))
+            history.append((product_id, run_id, seen_at, record.price, record.original_price))
+        if not products:
+            return 0
+        conn = self._connect()
+        with conn:
+            conn.executemany(UPSERT_PRODUCT, products)
+            conn.executemany(INSERT_HISTORY, history)
+        return len(products)
+
+    def get(self, product_id):
+        row = self._connect().execute(
+            'SELECT products.*, d.rating, d.rating_count, d.seller, d.enriched_at '
+            'FROM products LEFT JOIN product_details AS d USING (product_id) WHERE product_id = ?',
+            (product_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def fresh_details(self, product_ids, since):
+        """Detail-page fields of the given products enriched at or after since, keyed by product id"""
+        details = {}
+        ids = list(product_ids)
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows = self._connect().execute(
+                f"SELECT product_id, sizes, rating, rating_count, seller FROM product_details "
+                f"WHERE product_id IN ({', '.join('?' * len(chunk))}) AND enriched_at >= ?",
+                chunk + [since]
+            ).fetchall()
+            for row in rows:
+                details[row['product_id']] = {name: row[name] for name in ('sizes', 'rating', 'rating_count', 'seller')}
+        return details
+
+    def save_details(self, details, enriched_at=None):
+        """Store (product id, details dict) pairs fetched from product pages"""
+        enriched_at = time.time() if enriched_at is None else enriched_at
+        rows = [(product_id, d.get('sizes'), d.get('rating'), d.get('rating_count'), d.get('seller'), enriched_at)
+                for product_id, d in details]
+        if not rows:
+            return 0
+        conn = self._connect()
+        with conn:
+            conn.executemany('INSERT OR REPLACE INTO product_details (product_id, sizes, rating, rating_count, seller, '
+                             'enriched_at) VALUES (?, ?, ?, ?, ?, ?)', rows)
+        return len(rows)
+
+    def price_history(self, product_id):
+        rows = self._connect().execute(
+            'SELECT run_id, seen_at, price, original_price FROM price_history WHERE product_id = ? ORDER BY seen_at',
+            (product_id,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def price_drops(self, run_id=None, brand=None, limit=100):
+        """Products whose price in their latest run is lower than in the run before it, biggest drop first.
+
+        With run_id, only products seen in that run are considered.
+        """
+        # Matches the partial indexes, so the biggest drops are read off one of them in order
+        clauses = ['price_drop IS NOT NULL']
+        params = []
+        if run_id is not None:
+            clauses.append('last_run_id = ?')
+            params.append(run_id)
+        if brand:
+            clauses.append('brand_name = ?')
+            params.append(brand)
+        rows = self._connect().execute(
+            f"SELECT * FROM products WHERE {' AND '.join(clauses)} ORDER BY price_drop DESC LIMIT ?",
+            params + [limit]
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+get_default_store = lazy_default(ProductStore)
@@ -0,0 +1,188 @@
+import logging
+import math
+import os
+import sqlite3
+import threading
+import uuid
+
+from exports import export_etag, iter_frames, normalize_frame
+from product_records import COLUMNS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PER_PAGE = 48
+MAX_PER_PAGE = 500
+# Public sort name -> column; ties are broken by scrape order
+SORT_COLUMNS = {
+    'position': 'position',
+    'price': 'price',
+    'discount': 'discount_percent',
+    'brand': 'brand_name',
+    'rating': 'rating',
+}
+# Bumped whenever SCHEMA changes, so indexes built by older code are rebuilt
+INDEX_VERSION = 3
+
+SCHEMA = """
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE products (
+    position INTEGER PRIMARY KEY,
+    brand_name TEXT,
+    price INTEGER,
+    original_price INTEGER,
+    discount_percent INTEGER,
+    description TEXT,
+    sizes TEXT,
+    product_url TEXT,
+    rating REAL,
+    rating_count INTEGER,
+    seller TEXT
+);
+"""
+
+# Created after the bulk load, which is much faster than maintaining them row by row. Every index
+# also carries the rowid (position), so a one-column index already serves "column, position" sorts.
+INDEXES = """
+CREATE INDEX idx_products_price ON products (price);
+CREATE INDEX idx_products_discount ON products (discount_percent);
+CREATE INDEX idx_products_brand ON products (brand_name);
+CREATE INDEX idx_products_brand_price ON products (brand_name, price);
+CREATE INDEX idx_products_rating ON products (rating);
+ANALYZE;
+"""
+
+_build_locks = {}
+_build_locks_lock = threading.Lock()
+
+def index_path(output_path):
+    """Query index sidecar kept next to a run's data file"""
+    return os.path.normpath(output_path) + '.index.sqlite'
+
+def _source_version(output_path):
+    return export_etag(output_path, f"index-v{INDEX_VERSION}")
+
+def _indexed_version(path):
+    if not os.path.exists(path):
+        return None
+    try:
+        conn = sqlite3.connect(path)
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'source'").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning(f"Rebuilding unreadable results index {path}: {str(e)}")
+        return None
+    return row[0] if row else None
+
+def _build(output_path, path, version):
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    conn = sqlite3.connect(tmp_path)
+    try:
+        # A throwaway file until it is renamed into place, so durability does not matter here
+        conn.execute('PRAGMA journal_mode=OFF')
+        conn.execute('PRAGMA synchronous=OFF')
+        conn.executescript(SCHEMA)
+        insert = f"INSERT INTO products (position, {', '.join(COLUMNS)}) VALUES (?{', ?' * len(COLUMNS)})"
+        position = 0
+        for frame in iter_frames(output_path):
+            frame = normalize_frame(frame)
+            # Plain Python ints and None - sqlite3 rejects numpy integers and pd.NA
+            frame = frame.astype(object).where(frame.notna(), None)
+            rows = [(position + offset,) + row
+                    for offset, row in enumerate(frame.itertuples(index=False, name=None), 1)]
+            position += len(rows)
+            conn.executemany(insert, rows)
+        conn.executescript(INDEXES)
+        conn.execute("INSERT INTO meta (key, value) VALUES ('source', ?)", (version,))
+        conn.commit()
+        conn.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        conn.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    logger.info(f"Indexed {position} products of {output_path}")
+
+def ensure_index(output_path):
+    """Path of an up-to-date query index for output_path, (re)building it if the data file changed.
+
+    Runs still being scraped change with every page, so their index is rebuilt on the next query.
+    """
+    path = index_path(output_path)
+    version = _source_version(output_path)
+    if _indexed_version(path) == version:
+        return path
+    with _build_locks_lock:
+        lock = _build_locks.setdefault(path, threading.Lock())
+    with lock:
+        # Another request may have built it while this one waited
+        if _indexed_version(path) != version:
+            logger.info(f"Building results index for {output_path}")
+            _build(output_path, path, version)
+    return path
+
+def _where(brands, min_price, max_price):
+    clauses = []
+    params = []
+    if brands:
+        clauses.append(f"brand_name IN ({', '.join('?' * len(brands))})")
+        params.extend(brands)
+    if min_price is not None:
+        clauses.append('price >= ?')
+        params.append(min_price)
+    if max_price is not None:
+        clauses.append('price <= ?')
+        params.append(max_price)
+    return (f"WHERE {' AND '.join(clauses)}" if clauses else ''), params
+
+def order_by(sort, order):
+    """ORDER BY clause for a sort; ties follow the sort direction too, so a descending sort is a
+    backwards scan of the same index"""
+    column = SORT_COLUMNS[sort]
+    direction = order.upper()
+    if column == 'position':
+        return f"position {direction}"
+    return f"{column} {direction} NULLS LAST, position {direction}"
+
+def query_products(output_path, brands=None, min_price=None, max_price=None, sort='position', order='asc',
+                   page=1, per_page=DEFAULT_PER_PAGE):
+    """One page of a run's products, filtered by brand and price range and sorted.
+
+    Products without a value for the sort column come last in either direction; 'desc' also lists
+    products with equal values in reverse scrape order.
+    """
+    if sort not in SORT_COLUMNS:
+        raise ValueError(f"Unknown sort '{sort}', expected one of {tuple(SORT_COLUMNS)}")
+    if order not in ('asc', 'desc'):
+        raise ValueError(f"Unknown order '{order}', expected 'asc' or 'desc'")
+    per_page = max(1, min(per_page, MAX_PER_PAGE))
+    page = max(1, page)
+    brands = [brand for brand in (brands or []) if brand]
+
+    where, params = _where(brands, min_price, max_price)
+
+    conn = sqlite3.connect(ensure_index(output_path))
+    conn.row_factory = sqlite3.Row
+    try:
+        total = conn.execute(f"SELECT COUNT(*) FROM products {where}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM products {where} ORDER BY {order_by(sort, order)} LIMIT ? OFFSET ?",
+            params + [per_page, (page - 1) * per_page]
+        ).fetchall()
+    finally:
+        conn.close()
+    return {
+        'products': [dict(row) for row in rows],
+        'total': total,
+        'page': page,
+        'per_page': per_page,
+        'pages': math.ceil(total / per_page),
+        'sort': sort,
+        'order': order,
+        'filters': {'brand': brands, 'min_price': min_price, 'max_price': max_price},
+    }
@@ -0,0 +1,197 @@
+import logging
+import os
+import socket
+import time
+
+from sqlite_store import SQLiteStore, add_missing_columns, lazy_default
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CATALOG_PATH = os.environ.get('MYNTRA_CATALOG_PATH', os.path.join('csv_data', 'runs.sqlite'))
+# A running run whose owner has not reported progress for this many seconds is taken to be dead
+DEFAULT_STALE_AFTER = float(os.environ.get('MYNTRA_RUN_STALE_AFTER', 600))
+HOSTNAME = socket.gethostname()
+
+RUNNING = 'running'
+COMPLETE = 'complete'
+INTERRUPTED = 'interrupted'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    search_term TEXT NOT NULL,
+    term_slug TEXT NOT NULL,
+    output_path TEXT NOT NULL UNIQUE,
+    output_format TEXT NOT NULL,
+    no_of_pages INTEGER NOT NULL,
+    pages_done INTEGER NOT NULL DEFAULT 0,
+    row_count INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    finished_at REAL,
+    owner_host TEXT,
+    owner_pid INTEGER,
+    heartbeat_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_term_created ON runs (term_slug, created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_created ON runs (created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_status_term ON runs (status, term_slug);
+CREATE TABLE IF NOT EXISTS name_counters (
+    base_name TEXT PRIMARY KEY,
+    next_suffix INTEGER NOT NULL
+);
+"""
+
+# Added after the first catalogs were created, so older files get them with ALTER TABLE
+OWNER_COLUMNS = (('owner_host', 'TEXT'), ('owner_pid', 'INTEGER'), ('heartbeat_at', 'REAL'))
+
+def term_slug(search_term):
+    """The part of the output filename derived from the search term"""
+    return search_term.replace(' ', '_')
+
+class RunCatalog(SQLiteStore):
+    """SQLite index of scrape runs: term, output file, row count and status.
+
+    Output names keep the existing myntra_products_<term>[_N] scheme, but the next suffix for
+    a name comes from a counter row instead of probing the filesystem.
+    """
+
+    schema = SCHEMA
+
+    def __init__(self, path=DEFAULT_CATALOG_PATH):
+        super().__init__(path)
+
+    def _migrate(self, conn):
+        add_missing_columns(conn, 'runs', OWNER_COLUMNS)
+
+    def allocate_output(self, folder, base_name, extension):
+        """Reserve a new, unused output path for base_name in constant time"""
+        conn = self._connect()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT next_suffix FROM name_counters WHERE base_name = ?', (base_name,)).fetchone()
+            if row is None:
+                # First run recorded for this name: skip past files written before the catalog existed
+                suffix = 0
+                while os.path.exists(os.path.join(folder, _numbered(base_name, suffix) + extension)):
+                    suffix += 1
+            else:
+                suffix = row['next_suffix']
+            conn.execute('INSERT OR REPLACE INTO name_counters (base_name, next_suffix) VALUES (?, ?)',
+                         (base_name, suffix + 1))
+        return os.path.join(folder, _numbered(base_name, suffix) + extension)
+
+    def start_run(self, search_term, output_path, output_format, no_of_pages):
+        """Record a new run, owned by this process"""
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute(
+                'INSERT INTO runs (search_term, term_slug, output_path, output_format, no_of_pages, status, created_at, '
+                'owner_host, owner_pid, heartbeat_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (search_term, term_slug(search_term), output_path, output_format, no_of_pages, RUNNING, now,
+                 HOSTNAME, os.getpid(), now)
+            )
+        return cursor.lastrowid
+
+    def update_progress(self, run_id, pages_done, row_count):
+        """Record a finished page; this is also the owner's heartbeat"""
+        conn = self._connect()
+        with conn:
+            conn.execute('UPDATE runs SET pages_done = ?, row_count = ?, heartbeat_at = ? WHERE id = ?',
+                         (pages_done, row_count, time.time(), run_id))
+
+    def finish_run(self, run_id, status, row_count=None):
+        conn = self._connect()
+        with conn:
+            if row_count is None:
+                conn.execute('UPDATE runs SET status = ?, finished_at = ? WHERE id = ?', (status, time.time(), run_id))
+            else:
+                conn.execute('UPDATE runs SET status = ?, row_count = ?, finished_at = ? WHERE id = ?',
+                             (status, row_count, time.time(), run_id))
+
+    def get(self, run_id):
+        row = self._connect().execute('SELECT * FROM runs WHERE id = ?', (run_id,)).fetchone()
+        return dict(row) if row else None
+
+    def _resumable(self, conn, search_term, output_format, stale_after):
+        rows = conn.execute(
+            'SELECT * FROM runs WHERE status IN (?, ?) AND term_slug = ? AND output_format = ? '
+            'ORDER BY created_at DESC',
+            (RUNNING, INTERRUPTED, term_slug(search_term), output_format)
+        )
+        for row in rows:
+            # A running row is still being written unless its owner is gone
+            if row['status'] == INTERRUPTED or not owner_alive(row, stale_after):
+                return dict(row)
+        return None
+
+    def find_resumable(self, search_term, output_format, stale_after=None):
+        """Most recent unfinished run for the term in this format that no live process is writing, or None"""
+        if stale_after is None:
+            stale_after = DEFAULT_STALE_AFTER
+        return self._resumable(self._connect(), search_term, output_format, stale_after)
+
+    def claim_resumable(self, search_term, output_format, stale_after=None):
+        """Like find_resumable, but also take the run over for this process in the same transaction,
+        so two processes resuming the same term cannot both get it"""
+        if stale_after is None:
+            stale_after = DEFAULT_STALE_AFTER
+        conn = self._connect()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            run = self._resumable(conn, search_term, output_format, stale_after)
+            if run is not None:
+                if run['status'] == RUNNING:
+                    logger.warning(f"Taking over run {run['id']}: its owner (pid {run['owner_pid']} on "
+                                   f"{run['owner_host']}) is gone")
+                conn.execute('UPDATE runs SET status = ?, finished_at = NULL, owner_host = ?, owner_pid = ?, '
+                             'heartbeat_at = ? WHERE id = ?', (RUNNING, HOSTNAME, os.getpid(), time.time(), run['id']))
+        return run
+
+    def list_runs(self, search_term=None, status=None, limit=50, offset=0):
+        clauses = []
+        params = []
+        if search_term:
+            clauses.append('term_slug = ?')
+            params.append(term_slug(search_term))
+        if status:
+            clauses.append('status = ?')
+            params.append(status)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        rows = self._connect().execute(
+            f"SELECT * FROM runs {where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+def _pid_alive(pid):
+    if os.name == 'nt':
+        # os.kill would terminate the process on Windows; rely on the heartbeat there
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def owner_alive(run, stale_after=DEFAULT_STALE_AFTER):
+    """Whether the process that owns a running run may still be writing it.
+
+    The owner is gone when its heartbeat is older than stale_after seconds or, on this host,
+    when its pid no longer exists. Rows written before owners were recorded have none.
+    """
+    if run['owner_pid'] is None:
+        return False
+    if run['heartbeat_at'] is not None and time.time() - run['heartbeat_at'] > stale_after:
+        return False
+    if run['owner_host'] != HOSTNAME:
+        return True
+    return _pid_alive(run['owner_pid'])
+
+def _numbered(base_name, suffix):
+    return base_name if suffix == 0 else f"{base_name}_{suffix}"
+
+get_default_catalog = lazy_default(RunCatalog)
@@ -1,44 +1,39 @@
 import os
-import subprocess
-import pandas as pd
+import atexit
+import threading
 import logging
-import traceback
-import sys
-from flask import Flask, render_template, request, redirect, url_for, send_file, jsonify
-import time
-import re
+from flask import Flask, Response, render_template, request, redirect, url_for, send_file, jsonify, stream_with_context
+from werkzeug.utils import safe_join
+
+from log_config import configure_logging, job_log_path, tail_lines
 
 # Ensure required directories exist
-os.makedirs('logs', exist_ok=True)
 os.makedirs('csv_data', exist_ok=True)
 
-# Function to generate a unique filename if a file already exists - keep this for CSV files
-def get_unique_filename(folder, filename):
-    """Generate a unique filename by adding a number suffix if the file already exists"""
-    base_name, extension = os.path.splitext(filename)
-    counter = 1
-    new_filename = filename
-    
-    while os.path.exists(os.path.join(folder, new_filename)):
-        new_filename = f"{base_name}_{counter}{extension}"
-        counter += 1
-        
-    return new_filename
-
-# Configure logging - use fixed names and overwrite files
-log_path = os.path.join('logs', 'ui_app.log')
-
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_path, mode='w'),  # Use 'w' mode to overwrite
-        logging.StreamHandler()
-    ]
-)
+# Queue-based logging into logs/ui_app.log (appended and rotated); each job also gets logs/jobs/<id>.log
+log_path = configure_logging('ui_app.log')
 logger = logging.getLogger(__name__)
 logger.info(f"Logging to: {log_path}")
 
+# Imported after logging is configured so the scraper logs to the UI's files
+import modified_myntra_scraper
+from analytics import load_or_build
+import metrics
+from exports import (EXPORT_FORMATS, available_formats, build_export, cached_export_path, export_etag, is_complete,
+                     iter_export, negotiate_format, stored_format, stream_export)
+from browser_pool import close_shared_pool, get_shared_pool, shared_pool_stats
+from jobs import JobManager, DONE, FAILED, QUEUED, RUNNING
+from product_store import get_default_store
+from results_index import DEFAULT_PER_PAGE, SORT_COLUMNS, query_products
+from run_catalog import get_default_catalog
+
+SCRAPE_PAGES = 10
+# Number of scrapes that may run at the same time; further jobs wait in the queue
+MAX_CONCURRENT_JOBS = int(os.environ.get('MYNTRA_MAX_JOBS', '2'))
+
+# Run the scraper in-process instead of spawning a new interpreter per request
+job_manager = JobManager(modified_myntra_scraper.scrape_myntra, max_workers=MAX_CONCURRENT_JOBS)
+
 app = Flask(__name__)
 
 @app.route('/')
@@ -51,285 +46,270 @@ def scrape():
     search_term = request.form.get('search_term', '')
     if not search_term:
         logger.warning("No search term provided")
+        if wants_json():
+            return jsonify(error="Please enter a search term"), 400
         return render_template('index.html', error="Please enter a search term")
 
-    logger.info(f"Starting scrape for search term: '{search_term}'")
-    
-    # Create the CSV filename based on the search term
-    csv_base_filename = f"myntra_products_{search_term.replace(' ', '_')}.csv"
-    csv_filename = get_unique_filename('csv_data', csv_base_filename)
-    csv_filepath = os.path.join('csv_data', csv_filename)
-    
-    logger.info(f"CSV file will be: {csv_filepath}")
-    
-    # Always perform a new scrape
-    logger.info(f"Starting fresh scrape for '{search_term}'")
-    
-    # Create a direct test script that uses modified_myntra_scraper
-    tmp_script_path = 'tmp_script.py'
-    logger.info(f"Creating temporary script: {tmp_script_path}")
-    
-    # Set fixed log paths for subprocess
-    tmp_script_log_path = os.path.join('logs', 'tmp_script.log')
-    stdout_log_path = os.path.join('logs', f"subprocess_stdout.log")
-    stderr_log_path = os.path.join('logs', f"subprocess_stderr.log")
-    
-    with open(tmp_script_path, 'w') as f:
-        f.write(f'''
-import sys
-import os
-import logging
-import traceback
-import pandas as pd
+    # Recent results for the same term are reused unless a refresh is forced; scrapes run in the background
+    force_refresh = request.form.get('force_refresh', '').lower() in ('1', 'true', 'on', 'yes')
+    logger.info(f"Scrape requested for '{search_term}' (force_refresh={force_refresh})")
+    job = job_manager.submit(search_term, no_of_pages=SCRAPE_PAGES, force_refresh=force_refresh,
+                             output_format='csv', collect=False)
 
-# Ensure required directories exist
-os.makedirs('logs', exist_ok=True)
-os.makedirs('csv_data', exist_ok=True)
+    if wants_json():
+        return jsonify(job_id=job.id, status_url=url_for('job_status', job_id=job.id)), 202
+    return redirect(url_for('job_page', job_id=job.id))
 
-# Configure logging - use fixed filename and overwrite
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("{tmp_script_log_path.replace('\\', '\\\\')}", mode='w'),  # Overwrite mode
-        logging.StreamHandler()
-    ]
-)
-logger = logging.getLogger("tmp_script")
-
-logger.info("Starting temporary script")
-logger.info(f"Python executable: {{sys.executable}}")
-logger.info(f"Python version: {{sys.version}}")
-logger.info(f"Current directory: {{os.getcwd()}}")
-
-# Function to generate a unique filename if a file already exists
-def get_unique_filename(folder, filename):
-    """Generate a unique filename by adding a number suffix if the file already exists"""
-    base_name, extension = os.path.splitext(filename)
-    counter = 1
-    new_filename = filename
-    
-    while os.path.exists(os.path.join(folder, new_filename)):
-        new_filename = f"{{base_name}}_{{counter}}{{extension}}"
-        counter += 1
-        
-    return new_filename
+def wants_json():
+    """True for API clients (JSON body or Accept header) rather than the HTML form"""
+    if request.is_json:
+        return True
+    best = request.accept_mimetypes.best_match(['application/json', 'text/html'])
+    return best == 'application/json' and request.accept_mimetypes[best] > request.accept_mimetypes['text/html']
 
-try:
-    logger.info("Importing modified_myntra_scraper")
-    import modified_myntra_scraper
-    
-    # Modify the scraper's save path to use csv_data folder
-    orig_scrape_myntra = modified_myntra_scraper.scrape_myntra
-    
-    def wrapped_scrape_myntra():
-        # Override the scraper's CSV output path
-        orig_to_csv = pd.DataFrame.to_csv
-        
-        def patched_to_csv(self, *args, **kwargs):
-            if args and isinstance(args[0], str):
-                # Get the original filename from args
-                orig_filename = args[0]
-                basename = os.path.basename(orig_filename)
-                
-                # Create a new path in the csv_data folder
-                new_filename = get_unique_filename('csv_data', basename)
-                new_path = os.path.join('csv_data', new_filename)
-                
-                logger.info(f"Redirecting CSV output from {{orig_filename}} to {{new_path}}")
-                
-                # Replace the first arg (the filename)
-                args_list = list(args)
-                args_list[0] = new_path
-                args = tuple(args_list)
-            
-            # Call the original to_csv method
-            return orig_to_csv(self, *args, **kwargs)
-        
-        # Apply the patch
-        pd.DataFrame.to_csv = patched_to_csv
-        
-        # Call the original scrape_myntra function
-        result = orig_scrape_myntra()
-        
-        # Restore the original to_csv method
-        pd.DataFrame.to_csv = orig_to_csv
-        
-        return result
-    
-    # Replace the original function with our wrapped version
-    modified_myntra_scraper.scrape_myntra = wrapped_scrape_myntra
-    
-    # Override input function to return the search term
-    def mock_input(prompt):
-        logger.info(f"Mock input called with prompt: {{prompt}}")
-        return "{search_term}"
-    
-    # Replace the built-in input function with our mock
-    modified_myntra_scraper.input = mock_input
-    logger.info(f"Replaced input function to return '{search_term}'")
-    
-    # Run the scraper
-    logger.info("About to call scrape_myntra()")
-    df = modified_myntra_scraper.scrape_myntra()
-    
-    # Check for CSV files in the csv_data directory
-    csv_files = [f for f in os.listdir('csv_data') if f.endswith('.csv')]
-    search_term_files = [f for f in csv_files if f.startswith(f"myntra_products_{search_term.replace(' ', '_')}")]
-    
-    if search_term_files:
-        # Get the most recent file
-        latest_file = max(search_term_files, key=lambda f: os.path.getmtime(os.path.join('csv_data', f)))
-        csv_path = os.path.join('csv_data', latest_file)
-        
-        if os.path.exists(csv_path):
-            file_size = os.path.getsize(csv_path)
-            row_count = len(df) if df is not None else "unknown"
-            logger.info(f"Scraping completed. CSV file exists at {{csv_path}}. Size: {{file_size}} bytes, Rows: {{row_count}}")
-        else:
-            logger.error(f"Scraping might have failed. CSV file {{csv_path}} does not exist.")
-    else:
-        logger.error(f"No CSV files found for search term: {search_term}")
-    
-except Exception as e:
-    logger.critical(f"Critical error in tmp_script: {{str(e)}}")
-    logger.critical(traceback.format_exc())
-    raise
-''')
-    
-    logger.info("Running the temporary script")
+@app.route('/jobs/<job_id>')
+def job_page(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return render_template('index.html', error="Unknown or expired scrape job")
+    return render_template('job.html', job=job.to_dict())
+
+@app.route('/jobs/<job_id>/status')
+def job_status(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify(error="Unknown job"), 404
+    status = job.to_dict()
+    status['log_url'] = url_for('job_log', job_id=job.id)
+    if job.status == DONE:
+        status['results_url'] = url_for('job_results', job_id=job.id)
+    return jsonify(status)
+
+@app.route('/jobs/<job_id>/log')
+def job_log(job_id):
+    """Last lines of a job's own log file (?lines=50), read from the end of the file"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify(error="Unknown job"), 404
+    lines = min(max(request.args.get('lines', 50, type=int), 1), 1000)
+    return Response('\n'.join(tail_lines(job_log_path(job.id), lines)) + '\n', mimetype='text/plain')
+
+@app.route('/jobs/<job_id>/results')
+def job_results(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return render_template('index.html', error="Unknown or expired scrape job")
+    if job.status == FAILED:
+        return render_template('index.html', error=f"Error scraping data: {job.error}")
+    if job.status != DONE:
+        return redirect(url_for('job_page', job_id=job.id))
+    if not job.output_path or not job.rows_written:
+        logger.error(f"No products scraped for search term '{job.search_term}'")
+        return render_template('index.html',
+                             error=f"No results found for '{job.search_term}'. The website might have changed or is blocking scrapers.")
+
+    logger.info(f"Found output file: {job.output_path}")
+    return process_results(job.search_term, job.output_path, timings=job.timings.to_dict())
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus text exposition: stage timings, page/product/error counters, jobs and browser pool"""
+    jobs = job_manager.list()
+    extra = metrics.gauge_lines('myntra_jobs', "Scrape jobs currently remembered, by status",
+                                [({'status': status}, sum(1 for job in jobs if job.status == status))
+                                 for status in (QUEUED, RUNNING, DONE, FAILED)])
+    pool_stats = shared_pool_stats()
+    if pool_stats is not None:
+        extra += metrics.gauge_lines('myntra_browser_pool', "Shared browser pool state",
+                                     [({'state': state}, pool_stats[state])
+                                      for state in ('size', 'idle', 'leased', 'created', 'recycled')])
+    return Response(metrics.render(extra), mimetype='text/plain; version=0.0.4')
+
+@app.route('/runs')
+def list_runs():
+    """JSON listing of recorded scrape runs, newest first (?term=&status=&limit=&offset=)"""
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    runs = get_default_catalog().list_runs(search_term=request.args.get('term') or None,
+                                           status=request.args.get('status') or None,
+                                           limit=limit, offset=offset)
+    for run in runs:
+        run['results_url'] = url_for('run_results', run_id=run['id'])
+        run['products_url'] = url_for('results_products', filename=os.path.basename(run['output_path']))
+    return jsonify(runs=runs, limit=limit, offset=offset)
+
+@app.route('/runs/<int:run_id>')
+def run_results(run_id):
+    run = get_default_catalog().get(run_id)
+    if run is None or not os.path.exists(run['output_path']):
+        return render_template('index.html', error="Unknown or deleted scrape run")
+    return process_results(run['search_term'], run['output_path'])
+
+@app.route('/products/price-drops')
+def price_drops():
+    """JSON list of products cheaper than in the run before their latest one (?brand=&run_id=&limit=)"""
+    limit = min(request.args.get('limit', 100, type=int), 500)
+    products = get_default_store().price_drops(run_id=request.args.get('run_id', type=int),
+                                               brand=request.args.get('brand') or None,
+                                               limit=limit)
+    return jsonify(products=products, limit=limit)
+
+@app.route('/products/<int:product_id>/history')
+def product_history(product_id):
+    store = get_default_store()
+    product = store.get(product_id)
+    if product is None:
+        return jsonify(error="Unknown product"), 404
+    return jsonify(product=product, history=store.price_history(product_id))
+
+def results_query():
+    """query_products() arguments from the request's query string"""
+    return {
+        'brands': request.args.getlist('brand'),
+        'min_price': request.args.get('min_price', type=int),
+        'max_price': request.args.get('max_price', type=int),
+        'sort': request.args.get('sort', 'position'),
+        'order': request.args.get('order', 'asc'),
+        'page': request.args.get('page', 1, type=int),
+        'per_page': request.args.get('per_page', DEFAULT_PER_PAGE, type=int),
+    }
+
+def data_file_path(filename):
+    """Path of a scrape output under csv_data, or None if the name escapes it, does not exist or is not
+    a scrape output (the run catalog, product store and sidecar files are kept there too)"""
+    filepath = safe_join('csv_data', filename)
+    if filepath is None or stored_format(filepath) is None or not os.path.exists(filepath):
+        return None
+    return filepath
+
+def page_url(page):
+    """The current page's URL with the same filters and another page number"""
+    args = request.args.to_dict(flat=False)
+    args['page'] = page
+    return url_for(request.endpoint, **request.view_args, **args)
+
+@app.route('/results/<filename>/products')
+def results_products(filename):
+    """JSON page of a run's products (?brand=&brand=&min_price=&max_price=&sort=&order=&page=&per_page=)"""
+    filepath = data_file_path(filename)
+    if filepath is None:
+        return jsonify(error="Unknown results file"), 404
     try:
-        # Run the script and capture output
-        process = subprocess.Popen([sys.executable, tmp_script_path], 
-                                  stdout=subprocess.PIPE, 
-                                  stderr=subprocess.PIPE)
-        
-        stdout, stderr = process.communicate(timeout=180)  # 3 minute timeout
-        
-        stdout_str = stdout.decode('utf-8', errors='replace') if stdout else "None"
-        stderr_str = stderr.decode('utf-8', errors='replace') if stderr else "None"
-        
-        logger.info(f"Subprocess return code: {process.returncode}")
-        logger.info(f"Subprocess stdout: {stdout_str[:500]}...")  # Log first 500 chars
-        logger.info(f"Subprocess stderr: {stderr_str[:500]}...")  # Log first 500 chars
-        
-        # Write full output to log files for debugging
-        with open(stdout_log_path, "w", encoding="utf-8") as f:
-            f.write(stdout_str)
-        with open(stderr_log_path, "w", encoding="utf-8") as f:
-            f.write(stderr_str)
-        
-        if process.returncode != 0:
-            logger.error(f"Subprocess failed with return code {process.returncode}")
-            return render_template('index.html', 
-                                error=f"Error scraping data. Check logs for details.")
-        
-    except subprocess.TimeoutExpired:
-        logger.error("Subprocess timed out after 3 minutes")
-        process.kill()
-        return render_template('index.html', 
-                             error="Scraping timed out. The website might be slow or blocking automated access.")
-    except Exception as e:
-        logger.exception(f"Exception while running scraper: {str(e)}")
-        return render_template('index.html', 
-                             error=f"Error running scraper: {str(e)}")
-    finally:
-        # Always try to clean up the temporary script
-        try:
-            logger.info(f"Removing temporary script: {tmp_script_path}")
-            if os.path.exists(tmp_script_path):
-                os.remove(tmp_script_path)
-        except Exception as e:
-            logger.error(f"Error removing temporary script: {str(e)}")
-    
-    # Check for the log file from the scraper
-    scraper_log = os.path.join('logs', 'scraper.log')
-    if os.path.exists(scraper_log):
-        logger.info(f"Scraper log file exists at {scraper_log}, reading last 50 lines")
-        try:
-            with open(scraper_log, "r", encoding="utf-8") as f:
-                log_lines = f.readlines()
-                last_lines = log_lines[-50:] if len(log_lines) > 50 else log_lines
-                logger.info(f"Last lines from scraper.log: {''.join(last_lines)}")
-        except Exception as e:
-            logger.error(f"Error reading scraper log: {str(e)}")
-    
-    # Find the most recent CSV file for this search term in the csv_data directory
-    csv_pattern = re.compile(fr"myntra_products_{re.escape(search_term.replace(' ', '_'))}.*\.csv$")
-    matching_files = [f for f in os.listdir('csv_data') if csv_pattern.match(f)]
-    
-    if not matching_files:
-        logger.error(f"No CSV files found for search term '{search_term}' in csv_data directory")
-        return render_template('index.html', 
-                             error=f"No results found for '{search_term}'. The website might have changed or is blocking scrapers.")
-    
-    # Get the most recent file
-    latest_csv = max(matching_files, key=lambda f: os.path.getmtime(os.path.join('csv_data', f)))
-    latest_csv_path = os.path.join('csv_data', latest_csv)
-    
-    logger.info(f"Found CSV file: {latest_csv_path}")
-    return process_results(search_term, latest_csv_path)
+        result = query_products(filepath, **results_query())
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    return jsonify(result)
+
+@app.route('/results/<filename>/brands')
+def results_brands(filename):
+    """JSON list of the brands in a run with their product counts, from the run's analytics"""
+    filepath = data_file_path(filename)
+    if filepath is None:
+        return jsonify(error="Unknown results file"), 404
+    return jsonify(brands=load_or_build(filepath).brand_counts())
 
-def process_results(search_term, csv_filepath):
-    """Process the CSV results and render the template"""
+def process_results(search_term, csv_filepath, timings=None):
+    """Render the results page from the precomputed analytics and one filtered, sorted page of products"""
     logger.info(f"Processing results from {csv_filepath}")
     
-    # Read the CSV data
+    # Analytics come from the sidecar written while scraping; products are queried from the run's index
     try:
-        df = pd.read_csv(csv_filepath)
-        logger.info(f"CSV loaded successfully. Shape: {df.shape}")
+        run_analytics = load_or_build(csv_filepath)
+        analytics = run_analytics.to_dict()
+        logger.info(f"Loaded analytics for {analytics['total_products']} products")
         
-        if len(df) == 0:
+        if analytics['total_products'] == 0:
             logger.warning("CSV file is empty")
             return render_template('index.html', 
                                 error=f"No results found for '{search_term}'")
+        try:
+            listing = query_products(csv_filepath, **results_query())
+        except ValueError as e:
+            # Bad sort or order in a hand-edited URL - fall back to the defaults
+            logger.warning(f"Ignoring invalid results query: {str(e)}")
+            listing = query_products(csv_filepath)
+        # The brand facet comes from the analytics too, which count brands while the run streams in
+        brands = run_analytics.brand_counts()
     except Exception as e:
         logger.exception(f"Error reading CSV file: {str(e)}")
         return render_template('index.html', 
                              error=f"Error reading data: {str(e)}")
     
-    # Generate analytics
-    logger.info("Generating analytics")
-    analytics = {
-        "total_products": len(df),
-        "top_brands": df['brand_name'].value_counts().head(10).to_dict() if 'brand_name' in df.columns else {},
-        "price_range": {
-            "min": df['price'].min() if 'price' in df.columns and not pd.isna(df['price']).all() else 0,
-            "max": df['price'].max() if 'price' in df.columns and not pd.isna(df['price']).all() else 0,
-            "avg": round(df['price'].mean(), 2) if 'price' in df.columns and not pd.isna(df['price']).all() else 0
-        }
-    }
-    
-    # Prepare data for template (first 20 rows)
-    products = df.head(20).to_dict('records')
-    logger.info(f"Rendering results template with {len(products)} products")
+    logger.info(f"Rendering results template with {len(listing['products'])} of {listing['total']} products")
     
     # Extract just the filename for the download link
     csv_filename = os.path.basename(csv_filepath)
     
     return render_template('results.html', 
                           search_term=search_term,
-                          products=products, 
-                          total_products=len(df),
+                          products=listing['products'], 
+                          listing=listing,
+                          brands=brands,
+                          sort_options=SORT_COLUMNS,
+                          page_url=page_url,
+                          total_products=analytics['total_products'],
                           analytics=analytics,
+                          timings=timings,
+                          export_formats=available_formats(),
                           csv_file=csv_filename)
 
 @app.route('/download/<filename>')
 def download(filename):
+    """Send a scrape output as csv, csv.gz, ndjson or parquet (?format= or the Accept header).
+
+    Outputs already in the requested format, and exports cached by an earlier download, are sent
+    from disk with ETag and Range support. Other exports are streamed while they are generated,
+    one batch of rows at a time, and cached on the way unless the scrape is still running.
+    """
     logger.info(f"Downloading file: {filename}")
-    filepath = os.path.join('csv_data', filename)
-    
-    if not os.path.exists(filepath):
-        logger.error(f"File not found: {filepath}")
+    filepath = data_file_path(filename)
+    if filepath is None:
+        logger.error(f"File not found: {filename}")
         return "File not found", 404
-        
-    return send_file(filepath, as_attachment=True)
+
+    source_format = stored_format(filepath)
+    export_format = negotiate_format(request.args.get('format'), request.accept_mimetypes,
+                                     default=source_format)
+    if export_format is None:
+        return f"Unsupported format, expected one of {', '.join(available_formats())}", 406
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    base_name = filename[:-len(EXPORT_FORMATS[source_format][1])]
+    download_name = base_name + extension
+    etag = export_etag(filepath, export_format)
+
+    if export_format == source_format and os.path.isfile(filepath):
+        return send_file(os.path.abspath(filepath), as_attachment=True, download_name=download_name, mimetype=mimetype,
+                         etag=etag)
+    cache_path = cached_export_path(filepath, export_format, etag)
+    if not os.path.exists(cache_path) and request.range and is_complete(filepath):
+        # A byte range needs the whole export first; build it into the cache and serve from there
+        build_export(filepath, export_format, etag)
+    if os.path.exists(cache_path):
+        return send_file(os.path.abspath(cache_path), as_attachment=True, download_name=download_name,
+                         mimetype=mimetype, etag=etag)
+    if etag in request.if_none_match:
+        return Response(status=304, headers={'ETag': f'"{etag}"'})
+
+    if is_complete(filepath):
+        chunks = stream_export(filepath, export_format, etag)
+    else:
+        # Still being written - the ETag changes with every page, so don't cache the snapshot
+        chunks = iter_export(filepath, export_format)
+    logger.info(f"Streaming {export_format} export of {filename}")
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename="{download_name}"',
+        'ETag': f'"{etag}"',
+    })
 
 if __name__ == '__main__':
     # Create directories if they don't exist
     os.makedirs('templates', exist_ok=True)
-    os.makedirs('logs', exist_ok=True)
     os.makedirs('csv_data', exist_ok=True)
     
+    # Start the shared browsers in the background so the first search does not pay Chrome start-up
+    if os.environ.get('MYNTRA_BACKEND', modified_myntra_scraper.DEFAULT_BACKEND) == 'selenium':
+        threading.Thread(target=get_shared_pool().warm_up, name='browser-warm-up', daemon=True).start()
+    atexit.register(close_shared_pool)
+    
     logger.info("Starting Flask app")
     app.run(debug=True, use_reloader=False, port=5000) 
\ No newline at end of file
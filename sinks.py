@@ -0,0 +1,231 @@
+import csv
+import glob
+import json
+import logging
+import os
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional - only needed for the parquet sink
+    pa = None
+    pq = None
+
+from product_records import COLUMNS
+
+logger = logging.getLogger(__name__)
+
+FORMAT_EXTENSIONS = {
+    'csv': '.csv',
+    'ndjson': '.ndjson',
+    'parquet': '.parquet',
+}
+
+def parquet_schema():
+    """Arrow schema of the parquet outputs, matching the typed DataFrame columns"""
+    return pa.schema([
+        ('brand_name', pa.string()),
+        ('price', pa.int32()),
+        ('original_price', pa.int32()),
+        ('discount_percent', pa.int8()),
+        ('description', pa.string()),
+        ('sizes', pa.string()),
+        ('product_url', pa.string()),
+        ('rating', pa.float64()),
+        ('rating_count', pa.int32()),
+        ('seller', pa.string()),
+    ])
+
+def progress_path(path):
+    """Checkpoint file kept next to an output file while a scrape is in progress"""
+    return path + '.progress.json'
+
+class ProductSink:
+    """Writes scraped pages to disk as they complete, checkpointing after every page.
+
+    The checkpoint records the completed pages and how far the output had been written, so a
+    run that dies part-way can be resumed: anything written after the last checkpoint is
+    discarded and the crawl continues from the next page.
+    """
+
+    format = None
+
+    def __init__(self, path, resume=False, metadata=None):
+        self.path = path
+        self.metadata = metadata or {}
+        self.completed_pages = []
+        self.rows_written = 0
+        self._progress_path = progress_path(path)
+
+        state = self._load_progress() if resume else None
+        if state is not None:
+            self.completed_pages = state['completed_pages']
+            self.rows_written = state['rows_written']
+            self.metadata = dict(state.get('metadata', {}), **self.metadata)
+            logger.info(f"Resuming {path} after page {self.last_completed_page} ({self.rows_written} rows)")
+        self._open(state)
+        if state is None:
+            # Checkpoint straight away so even a run that dies before its first page can be resumed
+            self._save_progress()
+
+    @property
+    def last_completed_page(self):
+        return self.completed_pages[-1] if self.completed_pages else 0
+
+    def _load_progress(self):
+        if not os.path.exists(self._progress_path):
+            return None
+        try:
+            with open(self._progress_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint {self._progress_path}: {str(e)}")
+            return None
+
+    def _save_progress(self):
+        state = {
+            'format': self.format,
+            'completed_pages': self.completed_pages,
+            'rows_written': self.rows_written,
+            'offset': self._offset(),
+            'metadata': self.metadata,
+        }
+        tmp_path = self._progress_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self._progress_path)
+
+    def write_page(self, page_no, records):
+        """Append one page of records, flush it to disk and checkpoint"""
+        self._write(page_no, records)
+        self.rows_written += len(records)
+        self.completed_pages.append(page_no)
+        self._save_progress()
+        logger.debug("Wrote page %d (%d rows) to %s", page_no, len(records), self.path)
+
+    def close(self, complete=True):
+        """Close the output; a complete run drops its checkpoint, an interrupted one keeps it for resuming"""
+        self._close()
+        if complete and os.path.exists(self._progress_path):
+            os.remove(self._progress_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(complete=exc_type is None)
+
+    def _open(self, state):
+        raise NotImplementedError
+
+    def _write(self, page_no, records):
+        raise NotImplementedError
+
+    def _offset(self):
+        raise NotImplementedError
+
+    def _close(self):
+        raise NotImplementedError
+
+class _TextSink(ProductSink):
+    """Shared handling for append-only text formats: the checkpoint offset is the file size"""
+
+    def _open(self, state):
+        if state is not None and os.path.exists(self.path):
+            # Drop a partially written page left behind by the interrupted run
+            with open(self.path, 'r+b') as f:
+                f.truncate(state['offset'])
+            self._file = open(self.path, 'a', encoding='utf-8', newline='')
+        else:
+            self._file = open(self.path, 'w', encoding='utf-8', newline='')
+            self._write_header()
+
+    def _write_header(self):
+        pass
+
+    def _offset(self):
+        return self._file.tell()
+
+    def _flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _close(self):
+        self._file.close()
+
+class CsvSink(_TextSink):
+    format = 'csv'
+
+    def _open(self, state):
+        if state is not None and os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8', newline='') as f:
+                header = next(csv.reader(f), None)
+            # Appending rows of another layout would misalign every column after the first difference
+            if header is not None and tuple(header) != COLUMNS:
+                raise ValueError(f"Cannot resume {self.path}: it was written with the columns {header}")
+        super()._open(state)
+        self._writer = csv.writer(self._file)
+
+    def _write_header(self):
+        csv.writer(self._file).writerow(COLUMNS)
+
+    def _write(self, page_no, records):
+        self._writer.writerows(
+            ['' if value is None else value for value in (getattr(record, name) for name in COLUMNS)]
+            for record in records
+        )
+        self._flush()
+
+class NdjsonSink(_TextSink):
+    format = 'ndjson'
+
+    def _write(self, page_no, records):
+        for record in records:
+            row = {name: getattr(record, name) for name in COLUMNS}
+            self._file.write(json.dumps(row, ensure_ascii=False))
+            self._file.write('\n')
+        self._flush()
+
+class ParquetSink(ProductSink):
+    """Parquet dataset directory with one part file (a single row group) per page.
+
+    A Parquet file is only readable once its footer is written on close, so each page gets its
+    own small file; the directory reads back as one table with pd.read_parquet(path).
+    """
+
+    format = 'parquet'
+
+    def _open(self, state):
+        if pa is None:
+            raise ImportError("The 'parquet' output format requires the pyarrow package")
+        self._schema = parquet_schema()
+        os.makedirs(self.path, exist_ok=True)
+        completed = set(self.completed_pages)
+        for part in glob.glob(os.path.join(self.path, 'part-*.parquet')):
+            page_no = int(os.path.basename(part)[5:-8])
+            if page_no not in completed:
+                os.remove(part)
+
+    def _write(self, page_no, records):
+        columns = {name: [getattr(record, name) for record in records] for name in COLUMNS}
+        table = pa.Table.from_pydict(columns, schema=self._schema)
+        part_path = os.path.join(self.path, f"part-{page_no:05d}.parquet")
+        pq.write_table(table, part_path + '.tmp')
+        os.replace(part_path + '.tmp', part_path)
+
+    def _offset(self):
+        return len(self.completed_pages)
+
+    def _close(self):
+        pass
+
+SINKS = {
+    CsvSink.format: CsvSink,
+    NdjsonSink.format: NdjsonSink,
+    ParquetSink.format: ParquetSink,
+}
+
+def open_sink(path, output_format='csv', resume=False, metadata=None):
+    if output_format not in SINKS:
+        raise ValueError(f"Unknown output format '{output_format}', expected one of {tuple(SINKS)}")
+    return SINKS[output_format](path, resume=resume, metadata=metadata)
@@ -0,0 +1,58 @@
+import os
+import sqlite3
+import threading
+
+class SQLiteStore:
+    """Base for the SQLite files the scraper keeps: one connection per thread, in WAL mode so the
+    Flask threads can read while a scrape is writing.
+
+    Subclasses set schema and can override _migrate to bring files created by older code up to date.
+    """
+
+    schema = ''
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(self.schema)
+            self._migrate(conn)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _migrate(self, conn):
+        pass
+
+def add_missing_columns(conn, table, columns):
+    """ALTER TABLE in the (name, type) columns a table created by older code lacks; returns the names added"""
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    added = []
+    for name, column_type in columns:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+            added.append(name)
+    return added
+
+def lazy_default(factory):
+    """Getter for a process-wide instance that is created by factory on first use"""
+    lock = threading.Lock()
+    instances = []
+
+    def get():
+        with lock:
+            if not instances:
+                instances.append(factory())
+            return instances[0]
+
+    return get
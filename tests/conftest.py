@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run in an empty directory, so csv_data/ and logs/ are created there instead of in the repo"""
+    monkeypatch.chdir(tmp_path)
+    # The scraper only creates csv_data/ when it is first imported
+    (tmp_path / 'csv_data').mkdir()
+    return tmp_path
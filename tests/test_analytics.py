@@ -0,0 +1,33 @@
+import sqlite3
+
+from benchmarks.fixture_server import FixtureServer
+
+def test_brand_facet_from_the_sidecar_matches_the_data(workdir):
+    from analytics import RunAnalytics
+    from modified_myntra_scraper import scrape_myntra
+    from results_index import ensure_index
+    from run_catalog import RunCatalog
+
+    with FixtureServer() as server:
+        df = scrape_myntra('tshirts', no_of_pages=3, workers=2, min_interval=0, base_url=server.base_url,
+                           backend='http', product_store=False, catalog=RunCatalog(str(workdir / 'runs.sqlite')),
+                           collect=False, raise_errors=True)
+    facet = RunAnalytics.load(df.attrs['analytics_path']).brand_counts()
+
+    conn = sqlite3.connect(ensure_index(df.attrs['output_path']))
+    try:
+        rows = conn.execute('SELECT brand_name, COUNT(*) AS products FROM products WHERE brand_name IS NOT NULL '
+                            'GROUP BY brand_name ORDER BY products DESC, brand_name').fetchall()
+    finally:
+        conn.close()
+    assert facet == [{'brand': brand, 'products': count} for brand, count in rows]
+    assert sum(brand['products'] for brand in facet) == 150
+
+def test_products_without_a_brand_are_left_out_of_the_facet():
+    from analytics import RunAnalytics
+    from product_records import ProductRecord
+
+    analytics = RunAnalytics()
+    analytics.update([ProductRecord.from_fields(brand, 500, None, "Tee", "N/A", "N/A")
+                      for brand in ("Puma", "N/A", "HRX", "Puma", "N/A", "N/A")])
+    assert analytics.brand_counts() == [{'brand': 'Puma', 'products': 2}, {'brand': 'HRX', 'products': 1}]
@@ -0,0 +1,56 @@
+import time
+import urllib.request
+
+from benchmarks.fixture_server import FixtureServer
+from benchmarks.make_fixtures import make_products, page_html
+
+PAGES = 8
+PRODUCTS = 10
+PAGE_DELAY = 0.3  # Seconds every navigation takes, like a page load over the network
+
+class FakeDriver:
+    """Stand-in WebDriver: loads the fixture server's rendered pages over plain HTTP, taking a fixed time per page"""
+
+    capabilities = {}
+
+    def __init__(self):
+        self.page_source = ''
+
+    def get(self, url):
+        time.sleep(PAGE_DELAY)
+        with urllib.request.urlopen(url) as response:
+            self.page_source = response.read().decode('utf-8')
+
+    def execute_script(self, script):
+        return ['complete', 0, self.page_source.count('class="product-base"')]
+
+    def quit(self):
+        pass
+
+def rendered_pages():
+    return [page_html(make_products(page_no, PRODUCTS), PAGES * PRODUCTS, rendered=True).encode('utf-8')
+            for page_no in range(1, PAGES + 1)]
+
+def timed_scrape(server, workers, workdir):
+    from modified_myntra_scraper import scrape_myntra
+    from run_catalog import RunCatalog
+
+    start = time.perf_counter()
+    df = scrape_myntra('tshirts', no_of_pages=PAGES, workers=workers, min_interval=0, base_url=server.base_url,
+                       driver_factory=FakeDriver, backend='selenium', adaptive=False, product_store=False,
+                       catalog=RunCatalog(str(workdir / f"runs_{workers}.sqlite")), raise_errors=True)
+    return time.perf_counter() - start, df
+
+def test_workers_scale_page_loads_and_keep_page_order(workdir):
+    from product_store import parse_product_id
+
+    with FixtureServer(pages=rendered_pages()) as server:
+        serial, serial_df = timed_scrape(server, 1, workdir)
+        parallel, parallel_df = timed_scrape(server, 4, workdir)
+
+    # Two rounds of four pages instead of eight pages one after another
+    assert 0.2 < parallel / serial < 0.35, f"1 worker: {serial:.2f}s, 4 workers: {parallel:.2f}s"
+    expected = [product['productId'] for page_no in range(1, PAGES + 1) for product in make_products(page_no, PRODUCTS)]
+    for df in (serial_df, parallel_df):
+        assert [parse_product_id(url) for url in df['product_url']] == expected
+        assert df.attrs['rows_written'] == PAGES * PRODUCTS
@@ -0,0 +1,52 @@
+import pytest
+
+@pytest.fixture
+def client(workdir):
+    import simplified_ui
+
+    (workdir / 'csv_data' / 'myntra_products_jeans.csv').write_text(
+        "brand_name,price,original_price,discount_percent,description,sizes,product_url\n"
+        "Roadster,799,1599,50,Slim Fit Jeans,\"Sizes: 30, 32\",https://www.myntra.com/jeans/roadster/1/buy\n",
+        encoding='utf-8'
+    )
+    return simplified_ui.app.test_client()
+
+@pytest.mark.parametrize('filename', ['runs.sqlite', 'products.sqlite', 'myntra_products_jeans.csv.index.sqlite',
+                                      'myntra_products_jeans.csv.stats.json', 'missing.csv', '..'])
+def test_files_that_are_not_scrape_outputs_are_not_found(client, workdir, filename):
+    from product_store import ProductStore
+    from run_catalog import RunCatalog
+
+    RunCatalog(str(workdir / 'csv_data' / 'runs.sqlite'))
+    ProductStore(str(workdir / 'csv_data' / 'products.sqlite'))
+    client.get('/results/myntra_products_jeans.csv/products')  # builds the .index.sqlite sidecar
+    (workdir / 'csv_data' / 'myntra_products_jeans.csv.stats.json').write_text('{}', encoding='utf-8')
+
+    for url in (f'/download/{filename}', f'/results/{filename}/products', f'/results/{filename}/brands'):
+        assert client.get(url).status_code == 404, url
+
+def test_scrape_output_downloads(client):
+    response = client.get('/download/myntra_products_jeans.csv?format=ndjson')
+    assert response.status_code == 200
+    assert b'"brand_name": "Roadster"' in response.get_data()
+    assert client.get('/results/myntra_products_jeans.csv/brands').get_json() == {
+        'brands': [{'brand': 'Roadster', 'products': 1}]
+    }
+
+def test_parquet_is_refused_up_front_without_pyarrow(client, monkeypatch):
+    import exports
+    import simplified_ui
+
+    monkeypatch.setattr(exports, 'pa', None)
+    assert client.get('/download/myntra_products_jeans.csv?format=parquet').status_code == 406
+    assert client.get('/download/myntra_products_jeans.csv',
+                      headers={'Accept': 'application/vnd.apache.parquet'}).status_code == 406
+    # A wildcard still falls back to the stored format
+    response = client.get('/download/myntra_products_jeans.csv',
+                          headers={'Accept': 'application/vnd.apache.parquet, */*;q=0.1'})
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    with simplified_ui.app.test_request_context('/runs/1'):
+        page = simplified_ui.process_results('jeans', 'csv_data/myntra_products_jeans.csv')
+    assert 'format=csv.gz' in page
+    assert 'format=parquet' not in page
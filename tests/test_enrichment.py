@@ -0,0 +1,156 @@
+import time
+
+from benchmarks.fixture_server import FixtureServer, detail_values, load_fixtures
+
+def listing_records(page=0):
+    from http_backend import extract_embedded_products
+
+    return extract_embedded_products(load_fixtures()[page].decode('utf-8'))
+
+def product_id(record):
+    from product_store import parse_product_id
+
+    return parse_product_id(record.product_url)
+
+def enriched_fields(record):
+    return {name: getattr(record, name) for name in ('sizes', 'rating', 'rating_count', 'seller')}
+
+def test_concurrent_enrichment_matches_the_product_pages():
+    from enrichment import ProductEnricher
+
+    records = listing_records()
+    with FixtureServer(latency=0.02) as server:
+        enricher = ProductEnricher(concurrency=8, base_url=server.base_url)
+        try:
+            counts = enricher.enrich(records)
+        finally:
+            enricher.close()
+        assert server.detail_requests == len(records)
+    assert counts == {'fetched': len(records), 'cached': 0, 'failed': 0}
+    mismatches = [record for record in records if enriched_fields(record) != detail_values(product_id(record))]
+    assert not mismatches
+
+def test_failed_product_pages_keep_the_card_values():
+    from enrichment import ProductEnricher
+
+    records = listing_records()
+    failing = {product_id(record) for record in records[:3]}
+    cards = {product_id(record): enriched_fields(record) for record in records}
+    with FixtureServer(failing_details=failing) as server:
+        enricher = ProductEnricher(concurrency=4, base_url=server.base_url)
+        try:
+            counts = enricher.enrich(records)
+        finally:
+            enricher.close()
+    assert counts == {'fetched': len(records) - 3, 'cached': 0, 'failed': 3}
+    for record in records:
+        expected = cards[product_id(record)] if product_id(record) in failing else detail_values(product_id(record))
+        assert enriched_fields(record) == expected
+
+class CountingRateLimiter:
+    def __init__(self, min_interval):
+        from modified_myntra_scraper import RateLimiter
+
+        self._limiter = RateLimiter(min_interval)
+        self.waits = 0
+
+    def wait(self):
+        self.waits += 1
+        self._limiter.wait()
+
+def test_product_page_fetches_honour_the_rate_limiter():
+    from enrichment import ProductEnricher
+
+    records = listing_records()[:20]
+    limiter = CountingRateLimiter(0.02)
+    with FixtureServer() as server:
+        enricher = ProductEnricher(concurrency=8, base_url=server.base_url, rate_limiter=limiter)
+        try:
+            start = time.monotonic()
+            counts = enricher.enrich(records)
+            elapsed = time.monotonic() - start
+        finally:
+            enricher.close()
+    assert counts['fetched'] == 20
+    assert limiter.waits == 20
+    # 20 fetches one slot apart, however many are in flight at once
+    assert elapsed >= 19 * 0.02
+
+def test_products_enriched_within_the_ttl_are_not_fetched_again(tmp_path):
+    from enrichment import ProductEnricher
+    from product_store import ProductStore
+
+    store = ProductStore(str(tmp_path / 'products.sqlite'))
+    with FixtureServer() as server:
+        for expected in ({'fetched': 50, 'cached': 0}, {'fetched': 0, 'cached': 50}):
+            records = listing_records()
+            requests_before = server.detail_requests
+            enricher = ProductEnricher(concurrency=8, ttl=3600, store=store, base_url=server.base_url)
+            try:
+                counts = enricher.enrich(records)
+            finally:
+                enricher.close()
+            assert counts == dict(expected, failed=0)
+            assert server.detail_requests - requests_before == expected['fetched']
+            assert all(enriched_fields(record) == detail_values(product_id(record)) for record in records)
+
+        # Past the TTL the pages are fetched again
+        enricher = ProductEnricher(concurrency=8, ttl=0, store=store, base_url=server.base_url)
+        try:
+            assert enricher.enrich(listing_records())['fetched'] == 50
+        finally:
+            enricher.close()
+
+def test_scrape_merges_product_pages_into_its_output(workdir):
+    from modified_myntra_scraper import scrape_myntra
+    from product_store import ProductStore, parse_product_id
+    from run_catalog import RunCatalog
+
+    store = ProductStore(str(workdir / 'products.sqlite'))
+    limiter = CountingRateLimiter(0)
+    with FixtureServer() as server:
+        df = scrape_myntra('tshirts', no_of_pages=3, workers=2, base_url=server.base_url, backend='http',
+                           catalog=RunCatalog(str(workdir / 'runs.sqlite')), product_store=store,
+                           rate_limiter=limiter, enricher=True, raise_errors=True)
+        assert server.detail_requests == 150
+    # The product pages go through the run's rate limiter along with the three listing pages
+    assert limiter.waits == 153
+    assert df.attrs['enrichment'] == {'fetched': 150, 'cached': 0, 'failed': 0}
+    assert len(df) == 150
+    for row in df.to_dict('records'):
+        expected = detail_values(parse_product_id(row['product_url']))
+        assert {name: row[name] for name in expected} == expected
+    # Written out too, and kept in the store for the next run
+    with open(df.attrs['output_path'], encoding='utf-8') as f:
+        assert f.readline().strip().endswith('rating,rating_count,seller')
+    first = parse_product_id(df['product_url'][0])
+    assert store.get(first)['seller'] == detail_values(first)['seller']
+
+class ListingWatcher:
+    """Stand-in enricher that, while enriching the first page, waits for the next listing pages to load"""
+
+    def __init__(self, server, expected_requests):
+        self.server = server
+        self.expected_requests = expected_requests
+        self.requests_seen = []
+
+    def enrich(self, records):
+        deadline = time.monotonic() + 5
+        while self.server.request_count < self.expected_requests and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.requests_seen.append(self.server.request_count)
+        return {'fetched': len(records), 'cached': 0, 'failed': 0}
+
+def test_listing_pages_load_while_product_pages_are_fetched(workdir):
+    from modified_myntra_scraper import scrape_myntra
+    from run_catalog import RunCatalog
+
+    with FixtureServer() as server:
+        watcher = ListingWatcher(server, expected_requests=3)
+        df = scrape_myntra('tshirts', no_of_pages=3, workers=2, min_interval=0, base_url=server.base_url,
+                           backend='http', catalog=RunCatalog(str(workdir / 'runs.sqlite')), product_store=False,
+                           enricher=watcher, raise_errors=True)
+    # Pages 2 and 3 were fetched before page 1's enrichment finished
+    assert watcher.requests_seen[0] == 3
+    assert df.attrs['pages_scraped'] == 3
+    assert df.attrs['enrichment'] == {'fetched': 150, 'cached': 0, 'failed': 0}
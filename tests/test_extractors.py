@@ -0,0 +1,85 @@
+import pytest
+
+from benchmarks.fixture_server import load_fixtures
+
+# Cards the saved fixtures do not have, each exercising one lookup the extractors have to agree on
+EDGE_CASE_CARDS = {
+    # No discounted price: the whole div.product-price is the price
+    'price_fallback': (
+        '<li class="product-base"><a href="tshirts/puma/polo/30000001/buy"><div class="product-productMetaInfo">'
+        '<h3 class="product-brand">Puma</h3><h4 class="product-product">Polo T-shirt</h4>'
+        '<div class="product-price"><span>Rs. 1299</span></div></div></a></li>'
+    ),
+    'missing_href': (
+        '<li class="product-base"><a data-refreshpage="true"><h3 class="product-brand">HRX</h3>'
+        '<div class="product-price"><span>Rs. 499</span></div></a></li>'
+        '<li class="product-base"><h3 class="product-brand">WROGN</h3></li>'
+    ),
+    'entities': (
+        '<li class="product-base"><a href="tshirts/h&amp;m/tee/30000002/buy?src=a&amp;b=1">'
+        '<h3 class="product-brand">H&amp;M</h3><h4 class="product-product">Men&#8217;s &quot;Boxy&quot; Tee</h4>'
+        '<h4 class="product-sizes">Sizes: S, M</h4><div class="product-price"><span><span class="product-discountedPrice">'
+        'Rs. 1,049</span><span class="product-strike">Rs. 1,499</span></span></div></a></li>'
+    ),
+    # A card wrapped around another card, and a second class on the list item
+    'nested': (
+        '<li class="product-base product-sponsored"><a href="tshirts/levis/tee/30000003/buy">'
+        '<h3 class="product-brand">Levis</h3></a><ul><li class="product-base" id="30000004">'
+        '<a href="tshirts/roadster/tee/30000004/buy"><h3 class="product-brand">Roadster</h3>'
+        '<h4 class="product-product">Inner Tee</h4><div class="product-price"><span>Rs. 599</span></div></a></li></ul></li>'
+    ),
+}
+
+def edge_case_page(cards):
+    return (f'<html><head><title>Tshirts</title></head><body><span class="title-count"> - 12,345 items</span>'
+            f'<ul class="results-base">{cards}</ul></body></html>')
+
+def corpus():
+    pages = {f"fixture_{prefix}_{n}": page.decode('utf-8')
+             for prefix in ('rendered', 'listing') for n, page in enumerate(load_fixtures(prefix), 1)}
+    pages.update({name: edge_case_page(cards) for name, cards in EDGE_CASE_CARDS.items()})
+    return pages
+
+PAGES = corpus()
+
+def extractor(name):
+    from extractors import get_extractor
+
+    if name == 'lxml':
+        pytest.importorskip('lxml')
+    return get_extractor(name)
+
+@pytest.mark.parametrize('name', ['strainer', 'lxml'])
+@pytest.mark.parametrize('page', sorted(PAGES))
+def test_extractor_matches_the_soup_reference(name, page):
+    from extractors import SoupExtractor
+
+    assert extractor(name).extract(PAGES[page]) == SoupExtractor().extract(PAGES[page])
+
+def test_reference_reads_the_edge_cases():
+    from extractors import SoupExtractor
+
+    soup = SoupExtractor()
+    [record] = soup.extract(PAGES['price_fallback'])
+    assert (record.price, record.original_price, record.sizes) == (1299, None, "N/A")
+    assert [record.product_url for record in soup.extract(PAGES['missing_href'])] == ["N/A", "N/A"]
+    [record] = soup.extract(PAGES['entities'])
+    assert (record.brand_name, record.description) == ("H&M", "Men’s \"Boxy\" Tee")
+    assert (record.price, record.original_price, record.discount_percent) == (1049, 1499, 30)
+    assert record.product_url == "https://www.myntra.com/tshirts/h&m/tee/30000002/buy?src=a&b=1"
+    outer, inner = soup.extract(PAGES['nested'])
+    assert (outer.brand_name, inner.brand_name) == ("Levis", "Roadster")
+    # The fixtures render 50 cards per page; the listing pages have none until hydrated
+    assert len(soup.extract(PAGES['fixture_rendered_1'])) == 50
+    assert soup.extract(PAGES['fixture_listing_1']) == []
+
+@pytest.mark.parametrize('page, expected', [
+    ('fixture_rendered_1', 150),
+    ('fixture_listing_2', 150),
+    ('nested', 12345),
+])
+def test_total_count(page, expected):
+    from extractors import extract_total_count
+
+    assert extract_total_count(PAGES[page]) == expected
+    assert extract_total_count('<html><body><ul class="results-base"></ul></body></html>') is None
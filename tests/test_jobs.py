@@ -0,0 +1,55 @@
+import threading
+
+import pandas as pd
+
+from jobs import DONE, JobManager
+
+def scraper(workdir, calls, gate):
+    def scrape(search_term, no_of_pages=None, on_page=None, raise_errors=False, timings=None, **kwargs):
+        gate.wait()
+        calls.append(search_term)
+        output_path = workdir / f"out_{len(calls)}.csv"
+        output_path.write_text("brand_name\nX\n", encoding='utf-8')
+        on_page(1, 1)
+        df = pd.DataFrame({'brand_name': ['X']})
+        df.attrs.update(output_path=str(output_path), rows_written=1, run_id=len(calls))
+        return df
+    return scrape
+
+def finished(manager, job):
+    # One worker, so a no-op queued behind the job runs once it is done
+    manager._executor.submit(lambda: None).result()
+    assert job.status == DONE
+    return job
+
+def test_cached_jobs_are_dropped_when_rescraped_or_their_output_is_deleted(tmp_path):
+    calls = []
+    gate = threading.Event()
+    gate.set()
+    manager = JobManager(scraper(tmp_path, calls, gate), max_workers=1)
+    try:
+        first = finished(manager, manager.submit('Jeans', no_of_pages=2))
+        # Same term, any spelling: served from the cache
+        assert manager.submit(' jeans ', no_of_pages=2) is first
+        assert len(calls) == 1
+
+        gate.clear()
+        refreshing = manager.submit('jeans', no_of_pages=2, force_refresh=True)
+        # The old result is dropped as soon as the refresh is asked for
+        assert len(manager.cache) == 0
+        gate.set()
+        refreshed = finished(manager, refreshing)
+        assert manager.submit('jeans', no_of_pages=2) is refreshed
+
+        (tmp_path / 'out_2.csv').unlink()
+        gate.clear()
+        rescraping = manager.submit('jeans', no_of_pages=2)
+        assert rescraping is not refreshed
+        assert len(manager.cache) == 0
+        gate.set()
+        rescraped = finished(manager, rescraping)
+        assert manager.submit('jeans', no_of_pages=2) is rescraped
+        assert len(calls) == 3
+    finally:
+        gate.set()
+        manager.shutdown()
@@ -0,0 +1,98 @@
+import pytest
+
+from benchmarks.fixture_server import FixtureServer
+from benchmarks.make_fixtures import make_products, page_html
+
+PRODUCTS = 10
+# A count far beyond the served pages, so only the pages themselves can end the crawl
+UNKNOWN_END = 10000
+
+def listing_pages(count, total_count):
+    return [page_html(make_products(page_no, PRODUCTS), total_count, rendered=False).encode('utf-8')
+            for page_no in range(1, count + 1)]
+
+def scrape(server, workdir, no_of_pages=10, **kwargs):
+    from modified_myntra_scraper import scrape_myntra
+    from run_catalog import RunCatalog
+
+    # One worker, so every request the server sees is one the crawl asked for
+    return scrape_myntra('tshirts', no_of_pages=no_of_pages, workers=1, min_interval=0, base_url=server.base_url,
+                         backend='http', product_store=False, catalog=RunCatalog(str(workdir / 'runs.sqlite')),
+                         raise_errors=True, **kwargs)
+
+def test_stops_on_an_empty_page(workdir):
+    with FixtureServer(pages=listing_pages(3, UNKNOWN_END), past_end='empty') as server:
+        df = scrape(server, workdir)
+    assert df.attrs['stop_reason'] == "page 4 is empty"
+    assert df.attrs['rows_written'] == 3 * PRODUCTS
+    assert df.attrs['pages_scraped'] == 3
+    assert server.request_count == 4
+
+def test_stops_on_a_page_that_repeats_earlier_products(workdir):
+    with FixtureServer(pages=listing_pages(3, UNKNOWN_END), past_end='repeat') as server:
+        df = scrape(server, workdir)
+    assert df.attrs['stop_reason'] == "page 4 only repeats products already scraped"
+    assert df.attrs['rows_written'] == 3 * PRODUCTS
+    assert df.attrs['pages_scraped'] == 3
+    assert server.request_count == 4
+
+@pytest.mark.parametrize('source', ['embedded', 'title'])
+def test_result_count_caps_the_pages(workdir, source):
+    pages = listing_pages(5, 25)
+    if source == 'title':
+        # Only the "Tshirts - 25 items" heading is left to read the count from
+        pages = [page.replace(b'"totalCount": 25, ', b'') for page in pages]
+        assert b'totalCount' not in pages[0]
+    with FixtureServer(pages=pages) as server:
+        df = scrape(server, workdir)
+    # 25 results at 10 per page end on page 3, although the server would serve (and cycle) more
+    assert df.attrs['stop_reason'] is None
+    assert df.attrs['pages_scraped'] == 3
+    assert df.attrs['rows_written'] == 3 * PRODUCTS
+    assert server.request_count == 3
+
+def test_max_products_trims_the_last_page_and_stops(workdir):
+    with FixtureServer(pages=listing_pages(5, UNKNOWN_END)) as server:
+        df = scrape(server, workdir, no_of_pages=None, max_products=25)
+    assert df.attrs['stop_reason'] == "reached the budget of 25 products"
+    assert df.attrs['rows_written'] == 25
+    assert len(df) == 25
+    assert df.attrs['pages_scraped'] == 3
+    assert server.request_count == 3
+
+def test_without_adaptive_pagination_every_requested_page_is_loaded(workdir):
+    with FixtureServer(pages=listing_pages(3, 25), past_end='empty') as server:
+        df = scrape(server, workdir, no_of_pages=5, adaptive=False)
+    assert df.attrs['stop_reason'] is None
+    assert df.attrs['pages_scraped'] == 5
+    assert df.attrs['rows_written'] == 3 * PRODUCTS
+    assert server.request_count == 5
+
+class Interrupted(Exception):
+    pass
+
+def interrupt_after(last_page):
+    def on_page(page_no, count):
+        if page_no == last_page:
+            raise Interrupted(page_no)
+    return on_page
+
+def test_resumed_run_keeps_the_result_count_cap(workdir):
+    with FixtureServer(pages=listing_pages(5, 25)) as server:
+        with pytest.raises(Interrupted):
+            scrape(server, workdir, on_page=interrupt_after(2))
+        requests_before = server.request_count
+        df = scrape(server, workdir, resume=True)
+    # Only page 1 carries the count; the resumed run still stops at page 3 of 25 results
+    assert df.attrs['pages_scraped'] == 3
+    assert df.attrs['rows_written'] == 3 * PRODUCTS
+    assert server.request_count - requests_before == 1
+
+def test_resumed_run_spots_a_repeat_of_its_last_page(workdir):
+    with FixtureServer(pages=listing_pages(2, UNKNOWN_END), past_end='repeat') as server:
+        with pytest.raises(Interrupted):
+            scrape(server, workdir, on_page=interrupt_after(2))
+        df = scrape(server, workdir, resume=True)
+    assert df.attrs['stop_reason'] == "page 3 only repeats products already scraped"
+    assert df.attrs['rows_written'] == 2 * PRODUCTS
+    assert df.attrs['pages_scraped'] == 2
@@ -0,0 +1,24 @@
+import sqlite3
+
+import pytest
+
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+def test_every_sort_is_served_by_an_index(workdir, order):
+    from results_index import SORT_COLUMNS, ensure_index, order_by
+
+    (workdir / 'data.csv').write_text(
+        "brand_name,price,original_price,discount_percent,description,sizes,product_url\n"
+        + "".join(f"Brand {i % 7},{500 + i},,{i % 50},Shirt,Sizes: M,https://www.myntra.com/s/{i}/buy\n"
+                  for i in range(200)),
+        encoding='utf-8'
+    )
+    conn = sqlite3.connect(ensure_index('data.csv'))
+    try:
+        for sort in SORT_COLUMNS:
+            plan = conn.execute(f"EXPLAIN QUERY PLAN SELECT * FROM products ORDER BY {order_by(sort, order)} "
+                                f"LIMIT 48 OFFSET 96").fetchall()
+            details = ' '.join(row[-1] for row in plan)
+            # A temp B-tree means sorting every row for each page
+            assert 'TEMP B-TREE' not in details, (sort, details)
+    finally:
+        conn.close()
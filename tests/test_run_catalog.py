@@ -0,0 +1,65 @@
+import subprocess
+import sys
+import time
+
+from run_catalog import INTERRUPTED, RUNNING, RunCatalog
+
+def _set_owner(catalog, run_id, host, pid, heartbeat_at):
+    conn = catalog._connect()
+    with conn:
+        conn.execute('UPDATE runs SET owner_host = ?, owner_pid = ?, heartbeat_at = ? WHERE id = ?',
+                     (host, pid, heartbeat_at, run_id))
+
+def test_running_run_is_only_resumable_once_its_owner_is_gone(tmp_path):
+    import run_catalog
+
+    catalog = RunCatalog(str(tmp_path / 'runs.sqlite'))
+    run_id = catalog.start_run('jeans', str(tmp_path / 'jeans.csv'), 'csv', 5)
+    # Written by this (live) process, like a web job still scraping
+    assert catalog.find_resumable('jeans', 'csv') is None
+    assert catalog.claim_resumable('jeans', 'csv') is None
+
+    owner = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])
+    try:
+        _set_owner(catalog, run_id, run_catalog.HOSTNAME, owner.pid, time.time())
+        assert catalog.find_resumable('jeans', 'csv') is None
+    finally:
+        owner.kill()
+        owner.wait()
+    # The owner died without marking the run interrupted
+    assert catalog.find_resumable('jeans', 'csv')['id'] == run_id
+
+    # Another host's pid cannot be checked, so only a stale heartbeat frees the run
+    _set_owner(catalog, run_id, 'other-host', owner.pid, time.time())
+    assert catalog.find_resumable('jeans', 'csv') is None
+    _set_owner(catalog, run_id, 'other-host', owner.pid, time.time() - 3600)
+    claimed = catalog.claim_resumable('jeans', 'csv', stale_after=600)
+    assert claimed['id'] == run_id
+    # Claimed for this process, so nobody else can take it now
+    run = catalog.get(run_id)
+    assert (run['status'], run['owner_host']) == (RUNNING, run_catalog.HOSTNAME)
+    assert catalog.find_resumable('jeans', 'csv') is None
+
+def test_interrupted_run_is_resumable_and_older_catalogs_are_migrated(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / 'runs.sqlite')
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        "CREATE TABLE runs (id INTEGER PRIMARY KEY AUTOINCREMENT, search_term TEXT NOT NULL, term_slug TEXT NOT NULL, "
+        "output_path TEXT NOT NULL UNIQUE, output_format TEXT NOT NULL, no_of_pages INTEGER NOT NULL, "
+        "pages_done INTEGER NOT NULL DEFAULT 0, row_count INTEGER NOT NULL DEFAULT 0, status TEXT NOT NULL, "
+        "created_at REAL NOT NULL, finished_at REAL);"
+        "INSERT INTO runs (search_term, term_slug, output_path, output_format, no_of_pages, status, created_at) "
+        "VALUES ('jeans', 'jeans', 'old.csv', 'csv', 5, 'running', 1);"
+    )
+    conn.commit()
+    conn.close()
+
+    catalog = RunCatalog(path)
+    # Runs recorded before owners were tracked have none to wait for
+    assert catalog.find_resumable('jeans', 'csv')['output_path'] == 'old.csv'
+
+    run_id = catalog.start_run('jeans', 'new.csv', 'csv', 5)
+    catalog.finish_run(run_id, INTERRUPTED, 10)
+    assert catalog.claim_resumable('jeans', 'csv')['id'] == run_id